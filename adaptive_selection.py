@@ -0,0 +1,174 @@
+import re
+import numpy as np
+
+# Base difficulty (1-10) for each question category
+CATEGORY_DIFFICULTY = {
+    "Background": 2.0,
+    "Behavioral": 4.0,
+    "Role-specific": 5.0,
+    "Technical": 6.0,
+}
+
+# Phrases that make a question harder or easier than its category baseline
+DIFFICULTY_CUES = [
+    (re.compile(r"\b(design|architect\w*|distributed|scal\w+|implement|optimi[sz]e)\b"), 2.0),
+    (re.compile(r"\b(trade-?offs?|theorem|concurren\w+|thread|complexity|security)\b"), 1.0),
+    (re.compile(r"\b(difficult|challenging|complex|conflict\w*|disagree\w*)\b"), 1.0),
+    (re.compile(r"\b(what's your experience|tell me about yourself|how do you keep up)\b"), -1.5),
+    (re.compile(r"^(what is|what's the difference)\b"), -0.5),
+]
+
+# Extra words that signal a skill in a question, beyond the skill's own name
+SKILL_SYNONYMS = {
+    "communication": ["explain", "communicate", "present", "stakeholder", "stakeholders", "non-technical"],
+    "leadership": ["lead", "leadership", "mentor", "mentored", "team", "decision-making"],
+    "problem solving": ["problem", "debugging", "debug", "issue", "solve", "solved", "troubleshoot"],
+    "teamwork": ["team", "collaborate", "disagreed", "member"],
+    "time management": ["deadline", "deadlines", "prioritize", "pressure", "tight"],
+    "adaptability": ["learn", "quickly", "change", "new"],
+    "technical knowledge": ["explain", "concept", "difference"],
+    "system design": ["design", "architecture", "scaling", "distributed", "scalable"],
+}
+
+# How strongly a skill gap pulls selection towards questions exercising that skill
+GAP_WEIGHT = 1.5
+
+# Penalty for picking a question outside the category planned for the slot
+CATEGORY_PENALTY = 100.0
+
+# Only the largest gaps steer selection, so one weak skill doesn't dominate
+MAX_GAP_SKILLS = 3
+
+_TOKEN_RE = re.compile(r"[a-z][a-z+#/'-]*")
+_STOPWORDS = {"and", "or", "the", "of", "a", "an", "in", "to", "for", "with", "on", "skills", "skill"}
+
+_index_cache = {}
+
+
+def _tokenize(text):
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def estimate_difficulty(category, text):
+    """Heuristic 1-10 difficulty for a question from its category and wording"""
+    difficulty = CATEGORY_DIFFICULTY.get(category, 5.0)
+    lowered = text.lower()
+    for pattern, delta in DIFFICULTY_CUES:
+        if pattern.search(lowered):
+            difficulty += delta
+    return float(min(10.0, max(1.0, difficulty)))
+
+
+class SelectionIndex:
+    """Precomputed difficulty and skill index over the questions of one job field"""
+
+    def __init__(self, bank, job_field):
+        entries = [
+            (category, text)
+            for category, texts in bank.common_questions.items()
+            for text in texts
+        ]
+        entries.extend(
+            (category, text)
+            for category, texts in bank.job_fields.get(job_field, {}).items()
+            for text in texts
+        )
+
+        self.questions = [{"category": category, "question": text} for category, text in entries]
+        self.categories = np.array([category for category, _ in entries])
+        self.difficulty = np.array([estimate_difficulty(category, text) for category, text in entries])
+        self.positions = {text: i for i, (_, text) in enumerate(entries)}
+
+        # Inverted index from token to the positions of questions containing it
+        postings = {}
+        for i, (_, text) in enumerate(entries):
+            for token in _tokenize(text):
+                postings.setdefault(token, []).append(i)
+        self.postings = {token: np.array(rows, dtype=np.intp) for token, rows in postings.items()}
+
+    def skill_positions(self, skill_name):
+        """Positions of questions that exercise a skill, matched by name and synonyms"""
+        key = skill_name.lower().strip()
+        tokens = (_tokenize(key) - _STOPWORDS) | set(SKILL_SYNONYMS.get(key, []))
+        rows = [self.postings[token] for token in tokens if token in self.postings]
+        if not rows:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(rows))
+
+
+def get_selection_index(bank, job_field):
+    """Return the selection index for a job field, rebuilt only when the bank changes"""
+    key = (bank.version, job_field)
+    index = _index_cache.get(key)
+    if index is None:
+        # Drop indexes built from older bank versions
+        for stale in [k for k in _index_cache if k[0] != bank.version]:
+            del _index_cache[stale]
+        index = SelectionIndex(bank, job_field)
+        _index_cache[key] = index
+    return index
+
+
+def _running_score(evaluations):
+    """Average overall score across evaluations, or None before the first answer"""
+    scores = [e.get("scores", {}).get("overall") for e in evaluations]
+    scores = [s for s in scores if isinstance(s, (int, float))]
+    if not scores:
+        return None
+    return sum(scores) / len(scores)
+
+
+def select_next_question(bank, job_field, evaluations, asked_questions, category=None,
+                         skill_assessment=None, seed=None):
+    """
+    Pick the next question based on how the candidate is doing so far.
+
+    Questions close to a target difficulty (just above the running score) are
+    preferred, with a bonus for questions exercising the candidate's weakest
+    skills. The category planned for the slot is kept whenever possible.
+
+    Parameters:
+    - bank: The current QuestionBank
+    - job_field: The selected job field
+    - evaluations: Evaluations recorded so far in this interview
+    - asked_questions: Question texts that must not be picked again
+    - category: Category planned for this slot, if any
+    - skill_assessment: Output of aggregate_skill_assessment for the evaluations
+    - seed: Seed for tie-breaking jitter; the same inputs and seed give the same pick
+
+    Returns:
+    - Dictionary with "category" and "question", or None if nothing is left
+    """
+    index = get_selection_index(bank, job_field)
+    if not index.questions:
+        return None
+
+    running_score = _running_score(evaluations)
+    # Before any answers, aim for the middle of the range
+    target = 5.0 if running_score is None else min(9.0, max(2.0, running_score + 1.0))
+    score = -np.abs(index.difficulty - target)
+
+    if skill_assessment:
+        gaps = sorted(
+            skill_assessment.get("assessed_levels", []),
+            key=lambda s: s["desired"] - s["current"],
+            reverse=True
+        )[:MAX_GAP_SKILLS]
+        for skill in gaps:
+            rows = index.skill_positions(skill["name"])
+            if rows.size:
+                score[rows] += GAP_WEIGHT * (skill["desired"] - skill["current"]) / 45.0
+
+    if category is not None:
+        score[index.categories != category] -= CATEGORY_PENALTY
+
+    # Small jitter so candidates with the same scores don't all get the same questions
+    score += np.random.default_rng(seed).uniform(0.0, 0.3, size=score.shape)
+
+    asked_rows = [index.positions[q] for q in asked_questions if q in index.positions]
+    if asked_rows:
+        score[asked_rows] = -np.inf
+    best = int(np.argmax(score))
+    if not np.isfinite(score[best]):
+        return None
+    return dict(index.questions[best])
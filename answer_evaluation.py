@@ -8,6 +8,30 @@ import streamlit as st
 import tempfile
 import firebase_admin
 from firebase_admin import credentials, storage
+from llm_json import parse_structured, with_defaults, REASK_MAX_TOKENS
+from model_routing import choose_route, track_route
+from heuristic_scoring import provisional_scores, remember_keywords
+from delivery_metrics import delivery_confidence
+
+# Fields every evaluation must have, with their types
+EVALUATION_SCHEMA = {
+    "scores": {
+        "content": int,
+        "clarity": int,
+        "technical_accuracy": int,
+        "confidence": int,
+        "overall": int
+    },
+    "feedback": {
+        "strengths": [str],
+        "areas_for_improvement": [str],
+        "missing_elements": [str]
+    },
+    "skills_demonstrated": [str],
+    "skill_levels": {str: int},
+    "improved_answer": str,
+    "keywords": [str]
+}
 
 # Define configure_firebase_cors function BEFORE it's called
 def configure_firebase_cors():
@@ -78,8 +102,41 @@ if not firebase_admin._apps:
 # Set OpenAI API key from Streamlit secrets
 openai.api_key = st.secrets.get("OPENAI_API_KEY", "")
 
+def _heuristic_scores(provisional):
+    """Full score set from provisional content/clarity scores"""
+    return {
+        "content": provisional["content"],
+        "clarity": provisional["clarity"],
+        "technical_accuracy": provisional["overall"],
+        "confidence": provisional["overall"],
+        "overall": provisional["overall"]
+    }
+
+def _local_evaluation(question, answer, job_field, provisional):
+    """
+    Evaluation for an answer too short to be worth an API call.
+
+    A model would score it at the bottom of the scale anyway, so the scores
+    come from the local heuristics and the feedback asks for a complete answer.
+    """
+    return {
+        "scores": _heuristic_scores(provisional),
+        "feedback": {
+            "strengths": ["Answered the question directly"] if answer and answer.strip() else [],
+            "areas_for_improvement": [
+                "Give a complete answer of at least a few sentences",
+                "Support your answer with a specific example from your experience"
+            ],
+            "missing_elements": ["A concrete example with the situation, your actions and the result"]
+        },
+        "skills_demonstrated": [],
+        "skill_levels": {},
+        "improved_answer": "",
+        "keywords": []
+    }
+
 # The enhanced answer evaluation function
-def get_answer_evaluation(question, answer, job_field):
+def get_answer_evaluation(question, answer, job_field, category=None, provisional=None, delivery=None):
     """
     Evaluate the interview answer using OpenAI and return structured evaluation data
     for the frontend dashboard.
@@ -88,10 +145,23 @@ def get_answer_evaluation(question, answer, job_field):
     - question: The interview question
     - answer: The candidate's answer
     - job_field: The job field (e.g., "Software Engineering", "Data Science")
+    - category: The question category (e.g., "Technical"), used to pick the model
+    - provisional: Scores from heuristic_scoring.provisional_scores, if already computed
+    - delivery: Metrics from delivery_metrics.compute_delivery_metrics for a spoken
+      answer; the confidence score is then measured locally instead of asked for
     
     Returns:
     - Dictionary containing structured evaluation data
     """
+    # Measured delivery replaces the model's guess at confidence from the transcript
+    schema = EVALUATION_SCHEMA
+    confidence_line = '"confidence": <score 1-10 for confidence and delivery>,\n            '
+    if delivery:
+        schema = {**EVALUATION_SCHEMA, "scores": {
+            key: spec for key, spec in EVALUATION_SCHEMA["scores"].items() if key != "confidence"
+        }}
+        confidence_line = ""
+    
     prompt = f"""
     You are a strict interview coach specializing in {job_field} roles. 
     Analyze the following interview response with realistic professional standards:
@@ -105,8 +175,7 @@ def get_answer_evaluation(question, answer, job_field):
             "content": <score 1-10 for answer content and relevance>,
             "clarity": <score 1-10 for clarity and organization>,
             "technical_accuracy": <score 1-10 for technical correctness, if applicable>,
-            "confidence": <score 1-10 for confidence and delivery>,
-            "overall": <overall score 1-10>
+            {confidence_line}"overall": <overall score 1-10>
         }},
         "feedback": {{
             "strengths": [<list of 2-3 key strengths>],
@@ -126,28 +195,62 @@ def get_answer_evaluation(question, answer, job_field):
     Ensure the response is valid JSON and all scores are integers.
     """
     
+    messages = [
+        {"role": "system", "content": "You are an expert interview coach providing structured evaluation data."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    if provisional is None:
+        provisional = provisional_scores(question, answer)
+    
+    # Trivial answers are scored locally, short non-technical ones by the small model
+    route = choose_route(answer, category)
+    
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert interview coach providing structured evaluation data."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.4,
-        )
-        
-        # Parse the JSON response
-        evaluation_data = json.loads(response["choices"][0]["message"]["content"])
+        with track_route(route):
+            if route.tier == "local":
+                evaluation_data = _local_evaluation(question, answer, job_field, provisional)
+            else:
+                response = openai.chat.completions.create(
+                    model=route.model,
+                    messages=messages,
+                    max_tokens=route.max_tokens,
+                    temperature=0.4,
+                )
+                reply = response.choices[0].message.content
+                
+                def reask(follow_up_prompt):
+                    # Only the missing fields are asked for, so this is far cheaper than a retry
+                    follow_up = openai.chat.completions.create(
+                        model=route.model,
+                        messages=messages + [
+                            {"role": "assistant", "content": reply},
+                            {"role": "user", "content": follow_up_prompt}
+                        ],
+                        max_tokens=REASK_MAX_TOKENS,
+                        temperature=0,
+                    )
+                    return follow_up.choices[0].message.content
+                
+                # Parse the JSON response, tolerating fences, truncation and missing fields
+                evaluation_data, missing = parse_structured(reply, schema, reask=reask)
+                if any(path.startswith("scores.") for path in missing):
+                    raise ValueError(f"Evaluation is missing scores: {', '.join(missing)}")
+                if missing:
+                    print(f"Evaluation missing fields after re-ask: {', '.join(missing)}")
+                evaluation_data = with_defaults(evaluation_data, schema)
+                # Later provisional scores for this question check coverage of these
+                remember_keywords(question, evaluation_data["keywords"])
         
-        # Apply realistic scoring based on answer length
+        # Apply realistic scoring based on answer length. Local-tier scores come from
+        # the heuristics, which already discount short answers, so they aren't scaled again.
         word_count = len(answer.split()) if answer else 0
-        if word_count < 20:
+        if route.tier == "local" or word_count >= 40:
+            score_factor = 1.0
+        elif word_count < 20:
             score_factor = 0.5
-        elif word_count < 40:
-            score_factor = 0.7
         else:
-            score_factor = 1.0
+            score_factor = 0.7
         
         # Adjust scores
         if "scores" in evaluation_data:
@@ -159,30 +262,32 @@ def get_answer_evaluation(question, answer, job_field):
             for skill in evaluation_data["skill_levels"]:
                 evaluation_data["skill_levels"][skill] = min(75, max(15, int(evaluation_data["skill_levels"][skill] * score_factor)))
         
+        if delivery:
+            # Not scaled by answer length: it was measured, not inferred from the text
+            evaluation_data["scores"]["confidence"] = delivery_confidence(delivery)
+            evaluation_data["delivery_metrics"] = delivery
+        
         # Add metadata
         evaluation_data["question"] = question
         evaluation_data["answer"] = answer
         evaluation_data["job_field"] = job_field
         evaluation_data["timestamp"] = datetime.now().isoformat()
+        evaluation_data["model_tier"] = route.tier
+        evaluation_data["provisional_scores"] = provisional
         
         return evaluation_data
     
     except Exception as e:
         print(f"Error generating evaluation: {str(e)}")
-        # Return a basic evaluation structure if there's an error
+        # Return a basic evaluation structure if there's an error, scored by the local heuristics
         return {
             "error": str(e),
             "question": question,
             "answer": answer,
             "job_field": job_field,
             "timestamp": datetime.now().isoformat(),
-            "scores": {
-                "content": 2,
-                "clarity": 2,
-                "technical_accuracy": 2,
-                "confidence": 2,
-                "overall": 2
-            },
+            "provisional_scores": provisional,
+            "scores": _heuristic_scores(provisional),
             "feedback": {
                 "strengths": ["Unable to analyze strengths due to error"],
                 "areas_for_improvement": ["Unable to analyze areas for improvement due to error"],
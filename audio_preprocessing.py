@@ -0,0 +1,255 @@
+import io
+import shutil
+import subprocess
+import threading
+import wave
+import numpy as np
+
+# Whisper works on 16 kHz mono float32
+WHISPER_SAMPLE_RATE = 16000
+
+# Energy is measured over frames of this length (seconds)
+FRAME_SECONDS = 0.02
+
+# Frames quieter than this are silence: an absolute floor, and a level relative to the loudest frame
+SILENCE_FLOOR_DB = -50.0
+SILENCE_RELATIVE_DB = -35.0
+
+# Silence kept either side of the speech so word onsets and endings aren't clipped (seconds)
+TRIM_PAD_SECONDS = 0.25
+
+# Recordings with less voiced audio than this are treated as empty (seconds)
+MIN_VOICED_SECONDS = 0.3
+
+# Gain normalization: target peak level, and the most a quiet recording is boosted
+TARGET_PEAK = 0.9
+MAX_GAIN_DB = 20.0
+
+# Compressed formats accepted for uploaded answers
+COMPRESSED_AUDIO_TYPES = ["ogg", "opus", "webm", "m4a", "mp3"]
+
+# Bytes moved per read/write between us and the streaming decoder
+DECODE_CHUNK_BYTES = 64 * 1024
+
+# Longest a compressed recording may take to decode (seconds)
+DECODE_TIMEOUT = 30
+
+# Decoded audio beyond this is dropped, so a tiny, highly compressed upload
+# can't expand into gigabytes of samples (seconds)
+MAX_DECODED_SECONDS = 600
+
+# Leading bytes that identify each container
+_MAGIC = [
+    (b"RIFF", 0, "wav"),
+    (b"OggS", 0, "ogg"),
+    (b"\x1aE\xdf\xa3", 0, "webm"),
+    (b"ID3", 0, "mp3"),
+    (b"\xff\xfb", 0, "mp3"),
+    (b"ftyp", 4, "mp4"),
+]
+
+
+def sniff_format(data):
+    """Container format of audio bytes from their magic number, or "unknown" """
+    for magic, offset, name in _MAGIC:
+        if data[offset:offset + len(magic)] == magic:
+            return name
+    return "unknown"
+
+
+def decode_wav(data):
+    """
+    Decode WAV bytes to 16 kHz mono float32 samples in [-1, 1].
+
+    Returns:
+    - The samples, or None if the bytes aren't PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    if width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    elif width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        return None
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    if rate != WHISPER_SAMPLE_RATE and len(samples):
+        # Linear resampling is plenty for speech recognition
+        target_length = int(round(len(samples) * WHISPER_SAMPLE_RATE / rate))
+        samples = np.interp(
+            np.linspace(0, len(samples) - 1, target_length),
+            np.arange(len(samples)),
+            samples
+        ).astype(np.float32)
+    return samples
+
+
+def _decode_with_ffmpeg(data):
+    """
+    Stream bytes through ffmpeg into 16 kHz mono float32, without temp files.
+
+    Output is capped at MAX_DECODED_SECONDS, and the whole decode (including
+    reading its output) is killed after DECODE_TIMEOUT.
+    """
+    process = subprocess.Popen(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-t", str(MAX_DECODED_SECONDS),
+         "-f", "f32le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    timed_out = threading.Event()
+
+    def stop():
+        # Killing the process ends the read loop below, so a stalled decoder can't hang the request
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(DECODE_TIMEOUT, stop)
+    watchdog.start()
+
+    def feed():
+        # Written in chunks from a thread so ffmpeg decodes while we are still sending
+        try:
+            for start in range(0, len(data), DECODE_CHUNK_BYTES):
+                process.stdin.write(data[start:start + DECODE_CHUNK_BYTES])
+            process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    max_bytes = MAX_DECODED_SECONDS * WHISPER_SAMPLE_RATE * 4
+    pcm = []
+    received = 0
+    try:
+        while received < max_bytes:
+            chunk = process.stdout.read(min(DECODE_CHUNK_BYTES, max_bytes - received))
+            if not chunk:
+                break
+            pcm.append(chunk)
+            received += len(chunk)
+        if received >= max_bytes:
+            # Backstop for -t: stop ffmpeg rather than reading any further
+            process.kill()
+        process.wait()
+    finally:
+        watchdog.cancel()
+    feeder.join(1)
+    if timed_out.is_set():
+        print(f"ffmpeg decode timed out after {DECODE_TIMEOUT}s")
+        return None
+    if process.returncode != 0 and received < max_bytes:
+        return None
+    raw = b"".join(pcm)
+    return np.frombuffer(raw[:len(raw) - len(raw) % 4], dtype=np.float32)
+
+
+def _decode_with_av(data):
+    """Decode through PyAV (installed with faster-whisper) when ffmpeg isn't on the PATH"""
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(io.BytesIO(data), sampling_rate=WHISPER_SAMPLE_RATE)
+    except Exception as e:
+        print(f"Could not decode compressed audio: {str(e)}")
+        return None
+
+
+def decode_compressed(data):
+    """
+    Decode Opus/OGG/WebM/MP3/M4A bytes to 16 kHz mono float32 samples.
+
+    Returns:
+    - The samples, or None if the bytes couldn't be decoded
+    """
+    if shutil.which("ffmpeg"):
+        try:
+            samples = _decode_with_ffmpeg(data)
+            if samples is not None:
+                return samples
+        except OSError as e:
+            print(f"ffmpeg decode failed: {str(e)}")
+    return _decode_with_av(data)
+
+
+def frame_levels_db(samples, sample_rate=WHISPER_SAMPLE_RATE):
+    """RMS level in dBFS of each FRAME_SECONDS frame (a trailing partial frame is dropped)"""
+    frame = int(sample_rate * FRAME_SECONDS)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return (20 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+def voiced_frames(levels):
+    """Boolean mask of frames loud enough to be speech"""
+    if levels.size == 0:
+        return np.zeros(0, dtype=bool)
+    threshold = max(SILENCE_FLOOR_DB, float(levels.max()) + SILENCE_RELATIVE_DB)
+    return levels > threshold
+
+
+def trim_silence(samples, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Cut leading and trailing silence (including the recorder's pause tail).
+
+    Returns:
+    - (trimmed samples, voiced seconds); empty samples if nothing was voiced
+    """
+    voiced = voiced_frames(frame_levels_db(samples, sample_rate))
+    if not voiced.any():
+        return samples[:0], 0.0
+    frame = int(sample_rate * FRAME_SECONDS)
+    pad = int(sample_rate * TRIM_PAD_SECONDS)
+    indices = np.flatnonzero(voiced)
+    start = max(0, indices[0] * frame - pad)
+    end = min(len(samples), (indices[-1] + 1) * frame + pad)
+    return samples[start:end], voiced.sum() * FRAME_SECONDS
+
+
+def normalize_gain(samples):
+    """Scale samples so the peak sits at TARGET_PEAK, boosting by at most MAX_GAIN_DB"""
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if peak <= 0:
+        return samples
+    gain = min(TARGET_PEAK / peak, 10 ** (MAX_GAIN_DB / 20))
+    return (samples * gain).astype(np.float32)
+
+
+def preprocess_recording(data):
+    """
+    Prepare a recorded answer for Whisper: decode, trim silence, normalize gain.
+
+    Parameters:
+    - data: WAV bytes from the recorder, or a compressed upload (Opus/OGG/WebM/...)
+
+    Returns:
+    - (samples, status): status is "ok" with 16 kHz float32 samples ready for
+      model.transcribe, "empty" (samples None) when the recording has no speech,
+      or "undecoded" (samples None) when the bytes couldn't be decoded
+    """
+    audio_format = sniff_format(data)
+    samples = decode_wav(data)
+    if samples is None:
+        samples = decode_compressed(data)
+    if samples is None:
+        return None, "undecoded"
+    # What the same audio costs as the recorder's 16-bit PCM, to track what compression saves
+    pcm_bytes = len(samples) * 2
+    print(f"audio_ingest format={audio_format} bytes={len(data)} pcm16_bytes={pcm_bytes} "
+          f"ratio={pcm_bytes / max(1, len(data)):.1f}")
+    trimmed, voiced_seconds = trim_silence(samples)
+    if voiced_seconds < MIN_VOICED_SECONDS:
+        return None, "empty"
+    return normalize_gain(trimmed), "ok"
@@ -5,9 +5,104 @@ import docx
 from io import BytesIO
 import requests
 import time
+import hashlib
+import itertools
+import multiprocessing
+import re
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from result_cache import PersistentCache, content_hash
+from resume_parser import split_resume_sections, split_long_text, extract_resume_fields
+from conversation_memory import ConversationMemory
+from llm_json import parse_structured, with_defaults, REASK_MAX_TOKENS
 
-def make_openai_request(data, max_retries=3):
-    """Make OpenAI API request with retry logic for rate limits"""
+# Limits that keep a large or malicious upload from tying up the app
+MAX_RESUME_BYTES = 5 * 1024 * 1024
+MAX_RESUME_PAGES = 20
+MAX_RESUME_CHARS = 50000
+EXTRACTION_TIMEOUT = 20  # seconds
+
+# Bump these when a prompt changes so cached results from the old prompt aren't served
+ANALYSIS_PROMPT_VERSION = "analysis-v4"
+RECOMMENDATIONS_PROMPT_VERSION = "recommendations-v1"
+QUICK_ANSWERS_PROMPT_VERSION = "quick-answers-v1"
+
+# How often the page checks on a running resume pipeline (seconds)
+PIPELINE_POLL_SECONDS = 0.25
+
+# Fixed prompts behind the quick-question buttons; answered ahead of time after analysis
+QUICK_QUESTIONS = [
+    "How can I improve my resume?",
+    "What should I focus on in interviews?",
+    "What are my career options?",
+]
+
+# JSON template line for each resume field the model can be asked for
+ANALYSIS_FIELD_TEMPLATES = {
+    "name": '"name": "name"',
+    "email": '"email": "email"',
+    "phone": '"phone": "phone"',
+    "current_role": '"current_role": "job title"',
+    "experience_years": '"experience_years": "years"',
+    "skills": '"skills": ["skills"]',
+    "strengths": '"strengths": ["strengths"]',
+    "areas_for_improvement": '"areas_for_improvement": ["improvements"]',
+}
+
+# Expected type of each analysis field, for validating the model's JSON
+ANALYSIS_FIELD_SCHEMA = {
+    "name": str,
+    "email": str,
+    "phone": str,
+    "current_role": str,
+    "experience_years": str,
+    "skills": [str],
+    "strengths": [str],
+    "areas_for_improvement": [str],
+}
+
+RECOMMENDATIONS_SCHEMA = {
+    "suitable_roles": [str],
+    "growth_opportunities": [str],
+    "skill_recommendations": [str],
+    "industry_insights": [str],
+    "salary_range": str,
+    "next_steps": [str],
+    "interview_focus_areas": [str],
+}
+
+# Fields that need judgement and always go to the model. Skills are also
+# found locally, but a dictionary misses domain skills, so both lists are merged.
+LLM_ANALYSIS_FIELDS = ["name", "current_role", "skills", "strengths", "areas_for_improvement"]
+
+# Fields extracted locally by resume_parser; only asked of the model when not found
+LOCAL_ANALYSIS_FIELDS = ["email", "phone", "experience_years"]
+
+# Resumes up to this length are analyzed in one call; longer ones are chunked by section
+SINGLE_CALL_RESUME_CHARS = 1500
+ANALYSIS_CHUNK_CHARS = 2500
+MAX_ANALYSIS_CHUNKS = 5
+
+# Most items kept per list field when merging chunk analyses
+MAX_MERGED_ITEMS = {"skills": 25, "strengths": 6, "areas_for_improvement": 6}
+
+# Values the model uses to mean "not in this chunk"
+_EMPTY_VALUES = {"", "n/a", "na", "none", "not found", "not specified", "unknown", "null"}
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def make_openai_request(data, max_retries=3, quiet=False):
+    """
+    Make OpenAI API request with retry logic for rate limits.
+
+    With quiet=True problems are printed instead of shown in the page, for
+    calls made from background threads that have no page to report to.
+    """
+    report = print if quiet else st.error
+    notify = print if quiet else st.info
     headers = {
         "Authorization": f"Bearer {st.secrets['OPENAI_API_KEY']}",
         "Content-Type": "application/json"
@@ -26,99 +121,384 @@ def make_openai_request(data, max_retries=3):
                 return response.json()
             elif response.status_code == 429:
                 # Rate limit hit, wait and retry
-                st.error(f"🔴 OpenAI 429 Error: {response.text}")
+                report(f"🔴 OpenAI 429 Error: {response.text}")
                 wait_time = 2 ** (attempt + 1)  # 2, 4, 6 seconds
-                st.info(f"Rate limit reached. Waiting {wait_time} seconds before retry...")
+                notify(f"Rate limit reached. Waiting {wait_time} seconds before retry...")
                 time.sleep(wait_time)
                 continue
             else:
-                st.error(f"OpenAI API error: {response.status_code}")
+                report(f"OpenAI API error: {response.status_code}")
                 return None
                 
         except Exception as e:
-            st.error(f"Request failed: {str(e)}")
+            report(f"Request failed: {str(e)}")
             if attempt < max_retries - 1:
                 time.sleep(2)
                 continue
             return None
     
-    st.error("Max retries reached. Please try again in a few minutes.")
+    report("Max retries reached. Please try again in a few minutes.")
     return None
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF file"""
+def _pdf_text(pdf_file, max_pages=MAX_RESUME_PAGES):
+    """Text of the first max_pages pages of a PDF"""
+    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    pages = itertools.islice(pdf_reader.pages, max_pages)
+    return "\n".join((page.extract_text() or "") for page in pages)[:MAX_RESUME_CHARS]
+
+def _docx_text(docx_file):
+    """Text of all paragraphs of a DOCX document"""
+    doc = docx.Document(docx_file)
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)[:MAX_RESUME_CHARS]
+
+def _extract_text_from_bytes(data, file_type):
+    """Extraction entry point run in the worker processes"""
+    if file_type == PDF_MIME_TYPE:
+        return _pdf_text(BytesIO(data))
+    if file_type == DOCX_MIME_TYPE:
+        return _docx_text(BytesIO(data))
+    return data.decode("utf-8", errors="replace")[:MAX_RESUME_CHARS]
+
+def stream_openai_request(data, max_retries=3):
+    """
+    Stream a chat completion from OpenAI, yielding content tokens as they arrive.
+
+    Retries like make_openai_request, but only until the first token has been
+    yielded. Closing the generator (e.g. when Streamlit stops the script run
+    because the user sent another message) closes the HTTP stream.
+    """
+    headers = {
+        "Authorization": f"Bearer {st.secrets['OPENAI_API_KEY']}",
+        "Content-Type": "application/json"
+    }
+    
+    for attempt in range(max_retries):
+        started = False
+        try:
+            response = requests.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers=headers,
+                json={**data, "stream": True},
+                stream=True,
+                timeout=(10, 30)  # connect, and longest gap between chunks
+            )
+            
+            if response.status_code == 429:
+                response.close()
+                wait_time = 2 ** (attempt + 1)
+                st.info(f"Rate limit reached. Waiting {wait_time} seconds before retry...")
+                time.sleep(wait_time)
+                continue
+            elif response.status_code != 200:
+                response.close()
+                st.error(f"OpenAI API error: {response.status_code}")
+                return
+            
+            try:
+                # Server-sent events: one "data: {...}" line per chunk, then "data: [DONE]"
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    payload = line[len("data: "):]
+                    if payload == "[DONE]":
+                        return
+                    token = json.loads(payload)["choices"][0].get("delta", {}).get("content")
+                    if token:
+                        started = True
+                        yield token
+                return
+            finally:
+                response.close()
+                
+        except requests.RequestException as e:
+            if started or attempt == max_retries - 1:
+                st.error(f"Request failed: {str(e)}")
+                return
+            time.sleep(2)
+    
+    st.error("Max retries reached. Please try again in a few minutes.")
+
+@st.cache_resource
+def get_extraction_pool():
+    """Process pool that parses resumes off the script thread"""
+    # spawn rather than fork: the Streamlit server process is multi-threaded
+    return ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _extract_resume_text_cached(digest, file_type, _data):
+    """Extract resume text, cached by content hash (the bytes themselves aren't hashed by Streamlit)"""
+    future = get_extraction_pool().submit(_extract_text_from_bytes, _data, file_type)
     try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        st.error(f"Error reading PDF: {str(e)}")
+        return future.result(timeout=EXTRACTION_TIMEOUT)
+    except FutureTimeoutError:
+        # The stuck worker can't be interrupted, so kill the pool's processes and start a fresh one
+        pool = get_extraction_pool()
+        get_extraction_pool.clear()
+        _kill_pool(pool)
+        raise
+
+def _kill_pool(pool):
+    """Kill a process pool's workers outright; shutdown() alone leaves a busy worker running"""
+    if hasattr(pool, "kill_workers"):
+        pool.kill_workers()  # Python 3.14+
+        return
+    # Other extractions still in flight on this pool fail with BrokenProcessPool
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_resume_text(uploaded_file):
+    """
+    Extract text from an uploaded resume (PDF, DOCX or TXT).
+
+    Results are cached by the SHA-256 of the file, so Streamlit reruns with the
+    same upload don't parse it again. Parsing runs in a process pool with a
+    timeout, and uploads over MAX_RESUME_BYTES are rejected up front.
+    """
+    data = uploaded_file.getvalue()
+    if len(data) > MAX_RESUME_BYTES:
+        st.error(f"Resume is too large. Please upload a file under {MAX_RESUME_BYTES // (1024 * 1024)} MB.")
         return ""
 
-def extract_text_from_docx(docx_file):
-    """Extract text from DOCX file"""
+    digest = hashlib.sha256(data).hexdigest()
     try:
-        doc = docx.Document(docx_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return _extract_resume_text_cached(digest, uploaded_file.type, data)
+    except FutureTimeoutError:
+        st.error("Reading your resume took too long. Please try a simpler or smaller file.")
+        return ""
     except Exception as e:
-        st.error(f"Error reading DOCX: {str(e)}")
+        st.error(f"Error reading resume: {str(e)}")
         return ""
 
-def analyze_resume_with_ai(resume_text):
-    """Analyze resume using OpenAI to extract key information"""
-    # Truncate resume text if too long to reduce token usage
-    if len(resume_text) > 1500:
-        resume_text = resume_text[:1500] + "..."
+@st.cache_resource
+def get_analysis_cache():
+    """Persistent cache of resume analyses and recommendations, shared by all sessions"""
+    try:
+        return PersistentCache("resume_analysis", max_entries=2000)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Resume analysis cache disabled: {str(e)}")
+        return None
+
+def _cached_result(key):
+    cache = get_analysis_cache()
+    return cache.get(key) if cache else None
+
+def _store_result(key, value):
+    cache = get_analysis_cache()
+    if cache and value:
+        cache.set(key, value)
+
+def _structured_request(data, schema, quiet=False):
+    """
+    Make a request whose reply should be JSON matching schema.
+
+    The reply is parsed tolerantly, and fields that are missing or invalid are
+    asked for once more in a short follow-up instead of repeating the call.
+
+    Returns:
+    - (parsed dict with missing fields left empty, or {} if nothing usable came back,
+      whether every field was actually answered)
+    """
+    result = make_openai_request(data, quiet=quiet)
+    if not result:
+        return {}, False
+    reply = result["choices"][0]["message"]["content"]
+    
+    def reask(prompt):
+        follow_up = make_openai_request({
+            **data,
+            "messages": data["messages"] + [
+                {"role": "assistant", "content": reply},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": REASK_MAX_TOKENS,
+            "temperature": 0
+        }, quiet=quiet)
+        return follow_up["choices"][0]["message"]["content"] if follow_up else None
+    
+    parsed, missing = parse_structured(reply, schema, reask=reask)
+    if not parsed:
+        return {}, False
+    if missing:
+        print(f"Model reply still missing fields: {', '.join(missing)}")
+    return with_defaults(parsed, schema), not missing
+
+def _analyze_resume_text(resume_text, fields, section=None, quiet=False):
+    """Run one analysis call over resume text (or one section of it); returns (parsed JSON, complete)"""
+    template = ",\n        ".join(ANALYSIS_FIELD_TEMPLATES[field] for field in fields)
+    scope = ""
+    if section:
+        scope = f"""
+    This is only the {section} part of a longer resume. Fill in just the fields
+    this part supports and leave the others as empty strings or empty lists.
+    """
     
     prompt = f"""
     Extract key info from this resume in JSON format:
-    
+    {scope}
     {resume_text}
     
     Return JSON:
     {{
-        "name": "name",
-        "email": "email", 
-        "phone": "phone",
-        "current_role": "job title",
-        "experience_years": "years",
-        "skills": ["skills"],
-        "strengths": ["strengths"],
-        "areas_for_improvement": ["improvements"]
+        {template}
     }}
     """
     
+    # Use helper function with retry logic
+    data = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 500,  # Reduced from 1000
+        "temperature": 0.3
+    }
+    
+    # A section legitimately leaves most fields empty, so only whole resumes get a re-ask
+    schema = {field: ANALYSIS_FIELD_SCHEMA[field] for field in fields}
+    if section:
+        result = make_openai_request(data, quiet=quiet)
+        if not result:
+            return {}, False
+        parsed, _ = parse_structured(result["choices"][0]["message"]["content"], schema)
+        return parsed, bool(parsed)
+    return _structured_request(data, schema, quiet=quiet)
+
+def _build_analysis_chunks(resume_text):
+    """Split a resume into (section label, text) chunks that cover all of it, within the chunk budget"""
+    sections = split_resume_sections(resume_text)
+    if set(sections) <= {"header"}:
+        pieces = _fit_chunks([("resume", resume_text)])
+        return [(f"section {i} of {len(pieces)}", piece) for i, (_, piece) in enumerate(pieces, 1)]
+    intro = "\n".join(filter(None, [sections.get("header"), sections.get("summary")]))
+    return _fit_chunks([("contact details and summary", intro),
+                        ("work experience", sections.get("experience", "")),
+                        ("skills", sections.get("skills", "")),
+                        ("education", sections.get("education", ""))])
+
+def _fit_chunks(parts):
+    """
+    Split (label, text) parts into at most MAX_ANALYSIS_CHUNKS chunks, dropping no text.
+
+    Pieces are up to ANALYSIS_CHUNK_CHARS long, or longer when the resume
+    wouldn't fit in the budget otherwise.
+    """
+    parts = [(label, text) for label, text in parts if text]
+    size = max(ANALYSIS_CHUNK_CHARS, -(-sum(len(text) for _, text in parts) // MAX_ANALYSIS_CHUNKS))
+    while True:
+        chunks = [(label, piece) for label, text in parts for piece in split_long_text(text, size)]
+        if len(chunks) <= MAX_ANALYSIS_CHUNKS:
+            return chunks
+        # Breaking at line ends leaves uneven pieces, so widen them until they fit
+        size = int(size * 1.2)
+
+def _years_value(value):
+    match = re.search(r"\d+(?:\.\d+)?", str(value))
+    return float(match.group()) if match else None
+
+def _merge_analyses(partials):
+    """Merge per-chunk analyses: first real value wins for scalars, lists are unioned"""
+    merged = {}
+    for partial in partials:
+        for key, value in partial.items():
+            if isinstance(value, list):
+                existing = merged.setdefault(key, [])
+                seen = {str(item).lower() for item in existing}
+                for item in value:
+                    if str(item).strip().lower() not in _EMPTY_VALUES and str(item).lower() not in seen:
+                        existing.append(item)
+                        seen.add(str(item).lower())
+            elif key == "experience_years":
+                # Each experience chunk only sees part of the career, so keep the largest figure
+                years = _years_value(value)
+                if years is not None and years > (_years_value(merged.get(key)) or 0):
+                    merged[key] = value
+            elif str(value).strip().lower() not in _EMPTY_VALUES and not merged.get(key):
+                merged[key] = value
+    
+    for key, limit in MAX_MERGED_ITEMS.items():
+        if key in merged:
+            merged[key] = merged[key][:limit]
+    return merged
+
+def _analyze_chunks_in_parallel(chunks, fields, quiet=False):
+    """
+    Analyze chunks concurrently; a failed chunk is skipped rather than failing the whole resume.
+
+    Returns:
+    - (analyses of the chunks that succeeded, whether every chunk did)
+    """
+    ctx = None if quiet else get_script_run_ctx()
+    
+    def analyze(chunk):
+        # Lets make_openai_request report errors into the page from this thread
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        label, text = chunk
+        try:
+            return _analyze_resume_text(text, fields, section=label, quiet=quiet)
+        except Exception as e:
+            print(f"Error analyzing {label} section: {str(e)}")
+            return {}, False
+    
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        results = list(pool.map(analyze, chunks))
+    return [partial for partial, _ in results if partial], all(complete for _, complete in results)
+
+def _merge_skills(local_skills, model_skills):
+    """Skills found locally followed by the model's others, without case-insensitive duplicates"""
+    merged = []
+    seen = set()
+    for skill in list(local_skills) + list(model_skills or []):
+        if str(skill).strip().lower() not in _EMPTY_VALUES and str(skill).lower() not in seen:
+            merged.append(skill)
+            seen.add(str(skill).lower())
+    return merged[:MAX_MERGED_ITEMS["skills"]]
+
+def analyze_resume_with_ai(resume_text, quiet=False):
+    """Analyze resume using OpenAI to extract key information"""
+    # Identical resumes (re-uploads, repeat visits) are answered from the cache
+    cache_key = content_hash(ANALYSIS_PROMPT_VERSION, resume_text)
+    cached = _cached_result(cache_key)
+    if cached:
+        return cached
+    
+    # Contact details and experience are found locally in milliseconds,
+    # so the model is only asked for the fields that need judgement
+    local_fields = extract_resume_fields(resume_text)
+    local_skills = local_fields.pop("skills", [])
+    fields = LLM_ANALYSIS_FIELDS + [f for f in LOCAL_ANALYSIS_FIELDS if f not in local_fields]
+    
     try:
-        # Use helper function with retry logic
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 500,  # Reduced from 1000
-            "temperature": 0.3
-        }
-        
-        result = make_openai_request(data)
-        
-        if result:
-            analysis_text = result["choices"][0]["message"]["content"].strip()
-            analysis_text = analysis_text.replace("```json", "").replace("```", "").strip()
-            return json.loads(analysis_text)
+        if len(resume_text) <= SINGLE_CALL_RESUME_CHARS:
+            analysis, complete = _analyze_resume_text(resume_text, fields, quiet=quiet)
         else:
-            return {}
+            # Longer resumes are covered in full: one call per section, run in parallel
+            chunks = _build_analysis_chunks(resume_text)
+            partials, complete = _analyze_chunks_in_parallel(chunks, fields, quiet=quiet)
+            analysis = _merge_analyses(partials)
+        
+        if analysis:
+            analysis.update(local_fields)
+            analysis["skills"] = _merge_skills(local_skills, analysis.get("skills"))
+            # A partial analysis is still shown, but only a complete one is cached,
+            # so failed chunks or defaulted fields are retried next time
+            if complete:
+                _store_result(cache_key, analysis)
+        return analysis
             
     except Exception as e:
-        st.error(f"Error analyzing resume: {str(e)}")
+        (print if quiet else st.error)(f"Error analyzing resume: {str(e)}")
         return {}
 
-def generate_career_recommendations(resume_analysis):
+def generate_career_recommendations(resume_analysis, quiet=False):
     """Generate career recommendations based on resume analysis"""
+    # Keyed on the analysis, which is itself cached per resume
+    cache_key = content_hash(RECOMMENDATIONS_PROMPT_VERSION, json.dumps(resume_analysis, sort_keys=True))
+    cached = _cached_result(cache_key)
+    if cached:
+        return cached
+    
     prompt = f"""
     Based on the following resume analysis, provide career recommendations and insights:
     
@@ -155,61 +535,244 @@ def generate_career_recommendations(resume_analysis):
             "temperature": 0.5
         }
         
-        result = make_openai_request(data)
-        
-        if result:
-            recommendations_text = result["choices"][0]["message"]["content"].strip()
-            recommendations_text = recommendations_text.replace("```json", "").replace("```", "").strip()
-            return json.loads(recommendations_text)
-        else:
-            return {}
+        recommendations, complete = _structured_request(data, RECOMMENDATIONS_SCHEMA, quiet=quiet)
+        # Recommendations with defaulted fields are shown but not cached
+        if complete:
+            _store_result(cache_key, recommendations)
+        return recommendations
             
     except Exception as e:
-        st.error(f"Error generating career recommendations: {str(e)}")
+        (print if quiet else st.error)(f"Error generating career recommendations: {str(e)}")
         return {}
 
-def chatbot_response(user_message, resume_analysis):
-    """Generate chatbot response based on user message and resume analysis"""
-    context = f"""
-    You are a career counselor and interview coach. You have access to the user's resume analysis:
-    
-    Resume Summary:
-    - Name: {resume_analysis.get('name', 'User')}
-    - Current Role: {resume_analysis.get('current_role', 'N/A')}
-    - Experience: {resume_analysis.get('experience_years', 'N/A')} years
-    - Skills: {', '.join(resume_analysis.get('skills', []))}
-    - Recommended Fields: {', '.join(resume_analysis.get('recommended_fields', []))}
-    - Strengths: {', '.join(resume_analysis.get('strengths', []))}
+CHATBOT_ERROR_MESSAGE = "I apologize, but I'm having trouble processing your request right now. Please try again in a few minutes."
+
+def _chatbot_system_prefix(resume_analysis):
+    """
+    Stable system prompt with the resume context.
+
+    Built only from the analysis, so it is identical on every turn and the
+    provider can cache it instead of re-reading it each time.
+    """
+    return f"""You are an expert interview coach and career counselor providing conversational career advice.
+Provide helpful, personalized career advice based on the user's background. Be conversational and supportive.
+
+Resume Summary:
+- Name: {resume_analysis.get('name', 'User')}
+- Current Role: {resume_analysis.get('current_role', 'N/A')}
+- Experience: {resume_analysis.get('experience_years', 'N/A')} years
+- Skills: {', '.join(resume_analysis.get('skills', []))}
+- Recommended Fields: {', '.join(resume_analysis.get('recommended_fields', []))}
+- Strengths: {', '.join(resume_analysis.get('strengths', []))}"""
+
+def _summarize_conversation(previous_summary, messages):
+    """Compress older chat turns (and the previous summary) into a short summary; runs on a background thread"""
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    data = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": "You summarize career coaching conversations. Keep facts about the user, their goals and advice already given. Reply with at most 120 words."},
+            {"role": "user", "content": f"Previous summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+        ],
+        "max_tokens": 200,
+        "temperature": 0.2
+    }
+    result = make_openai_request(data, quiet=True)
+    if result:
+        return result["choices"][0]["message"]["content"]
+    return None
+
+def _chatbot_request_data(user_message, resume_analysis, chat_history=None, memory=None):
+    """
+    Build the chat completion request for a coaching reply.
+
+    chat_history defaults to the session's history, which already ends with
+    user_message; memory defaults to the session's ConversationMemory.
+    """
+    if chat_history is None:
+        chat_history = st.session_state.chat_history
+    if memory is None:
+        if "chat_memory" not in st.session_state:
+            st.session_state.chat_memory = ConversationMemory()
+        memory = st.session_state.chat_memory
     
-    Chat History:
-    {chr(10).join([f"{msg['role']}: {msg['content']}" for msg in st.session_state.chat_history[-5:]])}
+    if not chat_history or chat_history[-1]["content"] != user_message:
+        chat_history = chat_history + [{"role": "user", "content": user_message}]
     
-    User Message: {user_message}
+    # Older turns are folded into a summary every few messages to keep prompts flat.
+    # That runs in the background while this reply streams, and is used from the next turn.
+    memory.start_refresh(chat_history, _summarize_conversation, get_background_executor())
     
-    Provide helpful, personalized career advice based on their background. Be conversational and supportive.
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": memory.build_messages(_chatbot_system_prefix(resume_analysis), chat_history),
+        "max_tokens": 500,
+        "temperature": 0.7
+    }
+
+def chatbot_response_stream(user_message, resume_analysis):
+    """Stream a chatbot response token by token"""
+    return stream_openai_request(_chatbot_request_data(user_message, resume_analysis))
+
+def stream_bot_reply(placeholder, tokens):
     """
-    
+    Render a bot reply into placeholder as tokens arrive and add it to the chat history.
+
+    If the user sends another message mid-reply, Streamlit stops this script
+    run at the next render; the finally block still keeps the partial reply
+    and closing the token generator cancels the request.
+    """
+    parts = []
     try:
-        # Use helper function with retry logic
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {"role": "system", "content": "You are an expert interview coach providing conversational career advice."},
-                {"role": "user", "content": context}
-            ],
-            "max_tokens": 500,
-            "temperature": 0.7
-        }
-        
-        result = make_openai_request(data)
-        
+        for token in tokens:
+            parts.append(token)
+            placeholder.markdown(f'<div class="chat-message bot-message">**Coach:** {"".join(parts)}▌</div>', unsafe_allow_html=True)
+    finally:
+        tokens.close()
+        reply = "".join(parts).strip() or CHATBOT_ERROR_MESSAGE
+        st.session_state.chat_history.append({"role": "bot", "content": reply})
+    return reply
+
+@st.cache_resource
+def get_background_executor():
+    """Threads for speculative API calls that outlive a single script run"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="career-coach")
+
+def _quick_answers_key(resume_analysis):
+    return content_hash(QUICK_ANSWERS_PROMPT_VERSION, json.dumps(resume_analysis, sort_keys=True))
+
+def _generate_quick_answers(resume_analysis):
+    """Answer every quick question for an analysis; runs on a background thread"""
+    answers = {}
+    for question in QUICK_QUESTIONS:
+        # A fresh history and memory: this runs outside the session's script run
+        data = _chatbot_request_data(question, resume_analysis, chat_history=[], memory=ConversationMemory())
+        result = make_openai_request(data, quiet=True)
         if result:
-            return result["choices"][0]["message"]["content"].strip()
-        else:
-            return "I apologize, but I'm having trouble processing your request right now. Please try again in a few minutes."
+            answers[question] = result["choices"][0]["message"]["content"].strip()
+    # Stored next to the analysis so repeat visits get them for free too
+    if len(answers) == len(QUICK_QUESTIONS):
+        _store_result(_quick_answers_key(resume_analysis), answers)
+    return answers
+
+def start_quick_answers(resume_analysis):
+    """Make quick-question answers available: from the cache, or generated in the background"""
+    cached = _cached_result(_quick_answers_key(resume_analysis))
+    if cached:
+        st.session_state.quick_answers = cached
+        st.session_state.quick_answers_future = None
+    else:
+        st.session_state.quick_answers = {}
+        st.session_state.quick_answers_future = get_background_executor().submit(_generate_quick_answers, resume_analysis)
+
+class ResumePipeline:
+    """
+    Background job that analyzes a resume and chains everything that depends
+    on the analysis straight after it.
+
+    Recommendations start the moment the analysis is parsed and the quick
+    answers run alongside them, so the page gets all of it in about one
+    round-trip of wall time. The job runs on get_background_executor() and
+    never touches st; the page reads its progress and results on each rerun.
+    """
+
+    def __init__(self, resume_text):
+        self.resume_text = resume_text
+        self.stage = "Analyzing your resume..."
+        self.progress = 0.0
+        self.analysis = {}
+        self.recommendations = {}
+        self.quick_answers_future = None
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            analysis = analyze_resume_with_ai(self.resume_text, quiet=True)
+            if not analysis:
+                return
             
-    except Exception as e:
-        return f"I apologize, but I'm having trouble processing your request right now. Please try again later."
+            if not _cached_result(_quick_answers_key(analysis)):
+                self.quick_answers_future = get_background_executor().submit(_generate_quick_answers, analysis)
+            # Published last, so the page never sees the analysis without its quick answers job
+            self.analysis = analysis
+            self.stage = "Generating career recommendations..."
+            self.progress = 0.5
+            self.recommendations = generate_career_recommendations(analysis, quiet=True)
+        except Exception as e:
+            print(f"Error in resume pipeline: {str(e)}")
+        finally:
+            self.progress = 1.0
+            self.done.set()
+
+def start_resume_pipeline(resume_text):
+    """Start analysis and recommendations for a resume in the background"""
+    for key in ("resume_analysis", "career_recommendations", "quick_answers", "quick_answers_future"):
+        st.session_state.pop(key, None)
+    pipeline = ResumePipeline(resume_text)
+    get_background_executor().submit(pipeline.run)
+    st.session_state.resume_pipeline = pipeline
+
+def sync_resume_pipeline():
+    """Copy whatever the running pipeline has finished into session state"""
+    pipeline = st.session_state.get("resume_pipeline")
+    if pipeline is None:
+        return
+    
+    if pipeline.analysis and not st.session_state.get("resume_analysis"):
+        st.session_state.resume_analysis = pipeline.analysis
+        if pipeline.quick_answers_future is not None:
+            st.session_state.quick_answers = {}
+            st.session_state.quick_answers_future = pipeline.quick_answers_future
+        else:
+            start_quick_answers(pipeline.analysis)
+    
+    if pipeline.done.is_set():
+        if pipeline.recommendations:
+            st.session_state.career_recommendations = pipeline.recommendations
+        if not pipeline.analysis:
+            st.error("❌ Resume analysis failed. Please try again in a few minutes.")
+        st.session_state.resume_pipeline = None
+
+def wait_for_resume_pipeline():
+    """
+    Show the running pipeline's progress until its next stage finishes, then
+    rerun so the finished part is displayed while the rest keeps going.
+    """
+    pipeline = st.session_state.get("resume_pipeline")
+    if pipeline is None:
+        return
+    
+    stage = pipeline.stage
+    bar = st.progress(pipeline.progress, text=stage)
+    started = time.time()
+    while not pipeline.done.wait(PIPELINE_POLL_SECONDS):
+        if pipeline.stage != stage:
+            break
+        # Creep towards the next stage so the bar shows the job is alive
+        elapsed = time.time() - started
+        bar.progress(min(pipeline.progress + 0.45, pipeline.progress + elapsed / 40), text=stage)
+    st.rerun()
+
+def ask_quick_question(question):
+    """Answer a quick-question button from the precomputed answers, streaming only as a fallback"""
+    st.session_state.chat_history.append({"role": "user", "content": question})
+    
+    answer = st.session_state.quick_answers.get(question)
+    future = st.session_state.quick_answers_future
+    if not answer and future is not None:
+        with st.spinner("Thinking..."):
+            try:
+                st.session_state.quick_answers = future.result(timeout=60)
+                st.session_state.quick_answers_future = None
+            except Exception as e:
+                print(f"Precomputed quick answers unavailable: {str(e)}")
+        answer = st.session_state.quick_answers.get(question)
+    
+    if answer:
+        st.session_state.chat_history.append({"role": "bot", "content": answer})
+    else:
+        stream_bot_reply(st.empty(), chatbot_response_stream(question, st.session_state.resume_analysis))
+    st.rerun()
 
 def run_career_coach():
     """Main function to run the career coach interface"""
@@ -305,13 +868,8 @@ def run_career_coach():
     )
     
     if uploaded_file is not None:
-        # Extract text based on file type
-        if uploaded_file.type == "application/pdf":
-            resume_text = extract_text_from_pdf(uploaded_file)
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            resume_text = extract_text_from_docx(uploaded_file)
-        else:  # txt file
-            resume_text = str(uploaded_file.read(), "utf-8")
+        # Extract text based on file type (cached per file, so reruns are free)
+        resume_text = extract_resume_text(uploaded_file)
         
         st.session_state.resume_text = resume_text
         
@@ -322,17 +880,15 @@ def run_career_coach():
             with st.expander("Preview extracted text"):
                 st.text_area("Resume content:", resume_text, height=200, disabled=True)
             
-            # Analyze resume button
+            # Analyze resume button; recommendations follow automatically in the same job
             if st.button("🔍 Analyze Resume", type="primary"):
-                with st.spinner("Analyzing your resume..."):
-                    st.session_state.resume_analysis = analyze_resume_with_ai(resume_text)
-                
-                if st.session_state.resume_analysis:
-                    st.success("✅ Resume analysis complete!")
-                    st.rerun()
+                start_resume_pipeline(resume_text)
         else:
             st.error("❌ Could not extract text from the uploaded file. Please try a different format.")
     
+    # Pick up whatever the background analysis has finished since the last run
+    sync_resume_pipeline()
+    
     # Show analysis results if available
     if st.session_state.get('resume_analysis'):
         analysis = st.session_state.resume_analysis
@@ -380,14 +936,19 @@ def run_career_coach():
                 for area in analysis['areas_for_improvement']:
                     st.write(f"• {area}")
         
-        # Career recommendations
-        if st.button("💡 Get Career Recommendations"):
+        # Career recommendations normally arrive from the pipeline; the button retries a failed run
+        if (not st.session_state.get('career_recommendations')
+                and st.session_state.get('resume_pipeline') is None
+                and st.button("💡 Get Career Recommendations")):
             with st.spinner("Generating career recommendations..."):
                 st.session_state.career_recommendations = generate_career_recommendations(analysis)
             
             if st.session_state.career_recommendations:
                 st.rerun()
     
+    # Progress of the running analysis/recommendations job, below what is already done
+    wait_for_resume_pipeline()
+    
     # Show career recommendations if available
     if st.session_state.get('career_recommendations'):
         recommendations = st.session_state.career_recommendations
@@ -445,37 +1006,21 @@ def run_career_coach():
             # Add user message to history
             st.session_state.chat_history.append({"role": "user", "content": user_input})
             
-            # Generate bot response
-            with st.spinner("Thinking..."):
-                bot_response = chatbot_response(user_input, st.session_state.resume_analysis)
-                st.session_state.chat_history.append({"role": "bot", "content": bot_response})
+            # Stream the bot response into the page as it is generated
+            st.markdown(f'<div class="chat-message user-message">**You:** {user_input}</div>', unsafe_allow_html=True)
+            stream_bot_reply(st.empty(), chatbot_response_stream(user_input, st.session_state.resume_analysis))
             
             st.rerun()
         
-        # Quick action buttons
+        # Quick action buttons (answers are precomputed right after analysis)
         st.markdown("**Quick Questions:**")
-        col1, col2, col3 = st.columns(3)
+        if "quick_answers" not in st.session_state:
+            start_quick_answers(st.session_state.resume_analysis)
         
-        with col1:
-            if st.button("How can I improve my resume?"):
-                st.session_state.chat_history.append({"role": "user", "content": "How can I improve my resume?"})
-                bot_response = chatbot_response("How can I improve my resume?", st.session_state.resume_analysis)
-                st.session_state.chat_history.append({"role": "bot", "content": bot_response})
-                st.rerun()
-        
-        with col2:
-            if st.button("What should I focus on in interviews?"):
-                st.session_state.chat_history.append({"role": "user", "content": "What should I focus on in interviews?"})
-                bot_response = chatbot_response("What should I focus on in interviews?", st.session_state.resume_analysis)
-                st.session_state.chat_history.append({"role": "bot", "content": bot_response})
-                st.rerun()
-        
-        with col3:
-            if st.button("What are my career options?"):
-                st.session_state.chat_history.append({"role": "user", "content": "What are my career options?"})
-                bot_response = chatbot_response("What are my career options?", st.session_state.resume_analysis)
-                st.session_state.chat_history.append({"role": "bot", "content": bot_response})
-                st.rerun()
+        for col, question in zip(st.columns(len(QUICK_QUESTIONS)), QUICK_QUESTIONS):
+            with col:
+                if st.button(question):
+                    ask_quick_question(question)
     
     else:
         st.info("👆 Upload your resume above to start using the career coach!")
\ No newline at end of file
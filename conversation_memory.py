@@ -0,0 +1,123 @@
+import threading
+
+# Token budget for the recent turns sent verbatim with each request
+WINDOW_TOKENS = 1200
+
+# Older turns are folded into the summary once this many are waiting
+SUMMARY_REFRESH_MESSAGES = 4
+
+# Upper bound for the rolling summary itself
+SUMMARY_MAX_TOKENS = 200
+
+# chat_history stores the coach's turns as "bot"; the API calls them "assistant"
+_API_ROLES = {"user": "user", "bot": "assistant", "assistant": "assistant"}
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Token-budgeted memory for a chat: a rolling window of recent turns plus a
+    compressed summary of everything older.
+
+    The window is filled newest-first until WINDOW_TOKENS is reached. Turns
+    that fall out of it are folded into the summary in batches, so prompt size
+    stays roughly flat however long the conversation gets. Summaries can be
+    refreshed on a background thread with start_refresh, so a turn never
+    waits on one. Until a summary covers a turn, that turn is still sent
+    verbatim, so nothing is dropped while a batch builds up or a refresh runs.
+    """
+
+    def __init__(self, window_tokens=WINDOW_TOKENS, refresh_messages=SUMMARY_REFRESH_MESSAGES):
+        self.window_tokens = window_tokens
+        self.refresh_messages = refresh_messages
+        self.summary = ""
+        # Index into chat_history of the first message not covered by the summary
+        self.summarized_upto = 0
+        # Guards summary/summarized_upto against a background refresh
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _window_start(self, chat_history, summarized_upto=None):
+        """Index of the oldest message that fits in the window (the latest always does)"""
+        if summarized_upto is None:
+            summarized_upto = self.summarized_upto
+        used = 0
+        start = len(chat_history)
+        while start > 0:
+            cost = estimate_tokens(chat_history[start - 1]["content"])
+            if start < len(chat_history) and used + cost > self.window_tokens:
+                break
+            used += cost
+            start -= 1
+        return max(start, summarized_upto)
+
+    def needs_summary(self, chat_history):
+        """True once enough turns have left the window to be worth summarizing"""
+        return self._window_start(chat_history) - self.summarized_upto >= self.refresh_messages
+
+    def refresh_summary(self, chat_history, summarize):
+        """
+        Fold the turns that left the window into the summary.
+
+        Parameters:
+        - chat_history: Full list of {"role", "content"} messages
+        - summarize: Callable taking (previous_summary, messages) and returning
+          the new summary text, or None if summarizing failed
+        """
+        with self._lock:
+            previous, summarized_upto = self.summary, self.summarized_upto
+        start = self._window_start(chat_history, summarized_upto)
+        pending = chat_history[summarized_upto:start]
+        if not pending:
+            return
+        summary = summarize(previous, pending)
+        if summary:
+            with self._lock:
+                # Keep the summary within its own budget even if the model runs long
+                self.summary = summary.strip()[:SUMMARY_MAX_TOKENS * 4]
+                self.summarized_upto = start
+
+    def start_refresh(self, chat_history, summarize, executor):
+        """
+        Refresh the summary on executor if it's due and no refresh is running.
+
+        summarize runs on a worker thread, so it must not touch st. The
+        history is copied first, so later appends don't race with it.
+
+        Returns:
+        - The future of the refresh, or None if none was started
+        """
+        with self._lock:
+            if self._refreshing or not self.needs_summary(chat_history):
+                return None
+            self._refreshing = True
+        snapshot = list(chat_history)
+
+        def run():
+            try:
+                self.refresh_summary(snapshot, summarize)
+            finally:
+                self._refreshing = False
+
+        return executor.submit(run)
+
+    def build_messages(self, system_prefix, chat_history):
+        """
+        Build the messages array for a request.
+
+        The system prefix comes first and is byte-identical across turns, so
+        the provider's prompt caching can reuse it; the summary follows, then
+        every turn it doesn't cover yet.
+        """
+        with self._lock:
+            summary, summarized_upto = self.summary, self.summarized_upto
+        messages = [{"role": "system", "content": system_prefix}]
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+        for message in chat_history[summarized_upto:]:
+            messages.append({"role": _API_ROLES.get(message["role"], "user"), "content": message["content"]})
+        return messages
@@ -0,0 +1,121 @@
+import re
+import numpy as np
+
+# Gaps between words at least this long count as pauses (seconds)
+PAUSE_MIN_SECONDS = 0.3
+
+# Pauses at least this long count as long silences (seconds)
+LONG_SILENCE_SECONDS = 2.0
+
+# Comfortable interview speaking rate (words per minute)
+TARGET_WPM = (120, 170)
+
+# Single-word fillers Whisper transcribes; multi-word ones are matched on the joined text
+FILLER_WORDS = {"um", "uh", "erm", "er", "ah", "hmm", "like", "basically", "actually", "literally"}
+FILLER_PHRASES = ["you know", "i mean", "sort of", "kind of"]
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+def segment_words(segments):
+    """
+    Flatten faster-whisper segments into word timings.
+
+    Uses the per-word timestamps when the model was run with word_timestamps=True,
+    otherwise spreads each segment's words evenly over its span.
+
+    Returns:
+    - (starts, ends, words): two float arrays in seconds and a list of lowercase words
+    """
+    starts, ends, words = [], [], []
+    for segment in segments:
+        timed = getattr(segment, "words", None)
+        if timed:
+            for word in timed:
+                starts.append(word.start)
+                ends.append(word.end)
+                words.append(word.word.strip().lower())
+        else:
+            tokens = segment.text.split()
+            if not tokens:
+                continue
+            edges = np.linspace(segment.start, segment.end, len(tokens) + 1)
+            starts.extend(edges[:-1])
+            ends.extend(edges[1:])
+            words.extend(token.lower() for token in tokens)
+    return np.asarray(starts, dtype=float), np.asarray(ends, dtype=float), words
+
+
+def compute_delivery_metrics(starts, ends, words):
+    """
+    Speaking rate, pauses and fillers for one answer from its word timings.
+
+    Parameters:
+    - starts, ends: Word start/end times in seconds (from segment_words)
+    - words: The words themselves
+
+    Returns:
+    - Dictionary of plain floats/ints (safe to store in the evaluation JSON),
+      or None if there are no words
+    """
+    if len(words) == 0:
+        return None
+    order = np.argsort(starts)
+    starts, ends = starts[order], ends[order]
+    words = [words[i] for i in order]
+
+    speaking_seconds = max(float(ends[-1] - starts[0]), 1e-6)
+    gaps = np.clip(starts[1:] - ends[:-1], 0, None)
+    pauses = gaps[gaps >= PAUSE_MIN_SECONDS]
+    voiced_seconds = max(speaking_seconds - float(pauses.sum()), 1e-6)
+
+    cleaned = [" ".join(_WORD_RE.findall(w)) for w in words]
+    joined = f" {' '.join(cleaned)} "
+    fillers = sum(w in FILLER_WORDS for w in cleaned) + sum(joined.count(f" {p} ") for p in FILLER_PHRASES)
+
+    return {
+        "duration_seconds": round(speaking_seconds, 1),
+        "word_count": len(words),
+        "words_per_minute": round(len(words) / speaking_seconds * 60, 1),
+        # Rate while actually talking, so a few long pauses don't hide rushing
+        "articulation_wpm": round(len(words) / voiced_seconds * 60, 1),
+        "pause_count": int(pauses.size),
+        "pause_mean_seconds": round(float(pauses.mean()), 2) if pauses.size else 0.0,
+        "pause_p90_seconds": round(float(np.percentile(pauses, 90)), 2) if pauses.size else 0.0,
+        "pause_ratio": round(float(pauses.sum()) / speaking_seconds, 3),
+        "long_silences": int((gaps >= LONG_SILENCE_SECONDS).sum()),
+        "filler_count": int(fillers),
+        "fillers_per_minute": round(fillers / speaking_seconds * 60, 1),
+    }
+
+
+def delivery_confidence(metrics):
+    """
+    Confidence/delivery score (1-10) from measured delivery, replacing the model's guess.
+
+    Starts from 10 and deducts for speaking too slowly or quickly, for fillers,
+    for long silences and for spending a large share of the answer paused.
+    """
+    low, high = TARGET_WPM
+    wpm = metrics["words_per_minute"]
+    rate_penalty = max(0.0, low - wpm, wpm - high) / 20
+    filler_penalty = metrics["fillers_per_minute"] / 3
+    silence_penalty = metrics["long_silences"] * 0.75
+    pause_penalty = max(0.0, metrics["pause_ratio"] - 0.2) * 10
+    score = 10 - min(3.0, rate_penalty) - min(3.0, filler_penalty) - min(3.0, silence_penalty) - min(2.0, pause_penalty)
+    return int(np.clip(round(score), 1, 10))
+
+
+def describe_delivery(metrics):
+    """Short feedback lines for the delivery metrics"""
+    low, high = TARGET_WPM
+    lines = [f"Speaking rate: {metrics['words_per_minute']:.0f} words per minute"]
+    if metrics["words_per_minute"] < low:
+        lines[0] += f" (a little slow; aim for {low}-{high})"
+    elif metrics["words_per_minute"] > high:
+        lines[0] += " (a little fast; slow down so key points land)"
+    lines.append(f"Pauses: {metrics['pause_count']} (longest 10%: {metrics['pause_p90_seconds']}s or more)")
+    if metrics["long_silences"]:
+        lines.append(f"Long silences over {LONG_SILENCE_SECONDS:.0f}s: {metrics['long_silences']}")
+    lines.append(f"Filler words: {metrics['filler_count']} ({metrics['fillers_per_minute']} per minute)")
+    return lines
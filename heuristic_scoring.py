@@ -0,0 +1,203 @@
+import re
+import sqlite3
+import numpy as np
+from result_cache import PersistentCache, content_hash
+
+# Word count at which an answer gets full marks for length
+TARGET_ANSWER_WORDS = 120
+
+# Sentence length range (words) that reads clearly when spoken
+CLEAR_SENTENCE_WORDS = (8, 25)
+
+# Phrases that mark each part of a STAR (Situation, Task, Action, Result) answer
+STAR_MARKERS = {
+    "situation": ["when i", "at my", "in my previous", "in my last", "last year", "we had", "there was",
+                  "situation", "project", "team", "company", "client"],
+    "task": ["my goal", "my role", "i was responsible", "i needed", "we needed", "had to", "task",
+             "challenge", "objective", "deadline", "requirement"],
+    "action": ["i decided", "i created", "i built", "i led", "i organized", "i organised", "i implemented",
+               "i designed", "i worked", "i analyzed", "i analysed", "i set up", "i spoke", "i proposed"],
+    "result": ["as a result", "in the end", "which led", "resulted in", "we delivered", "improved",
+               "increased", "reduced", "saved", "achieved", "outcome", "percent", "%"],
+}
+
+# Filler words and phrases that hurt clarity
+FILLER_PHRASES = ["um", "uh", "erm", "like", "basically", "actually", "literally", "you know",
+                  "sort of", "kind of", "i mean", "i guess"]
+
+# Words ignored when taking keywords from the question itself
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "describe", "do", "does", "explain", "for",
+    "from", "have", "how", "i", "in", "is", "it", "me", "of", "on", "or", "tell", "that", "the", "this",
+    "time", "to", "what", "when", "where", "which", "who", "why", "with", "would", "you", "your",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9%']+")
+_SENTENCE_RE = re.compile(r"[.!?]+")
+
+
+def _contains(padded, phrase):
+    return f" {phrase} " in padded
+
+
+def answer_features(answer, keywords=()):
+    """
+    Text features of one answer.
+
+    Returns:
+    - [word count, STAR coverage, keyword coverage (nan if no keywords),
+       filler rate, lexical diversity, mean sentence length]
+    """
+    words = _WORD_RE.findall(answer.lower()) if answer else []
+    n = len(words)
+    if n == 0:
+        return [0, 0.0, 0.0 if keywords else np.nan, 0.0, 0.0, 0.0]
+    padded = f" {' '.join(words)} "
+
+    star = sum(any(_contains(padded, m) for m in markers) for markers in STAR_MARKERS.values())
+    if keywords:
+        hits = sum(_contains(padded, " ".join(_WORD_RE.findall(k.lower()))) for k in keywords)
+        coverage = hits / len(keywords)
+    else:
+        coverage = np.nan
+    fillers = sum(padded.count(f" {phrase} ") for phrase in FILLER_PHRASES)
+    sentences = [s for s in _SENTENCE_RE.split(answer) if s.strip()]
+    return [
+        n,
+        star / len(STAR_MARKERS),
+        coverage,
+        fillers / n,
+        # Root type-token ratio stays comparable across answer lengths
+        len(set(words)) / np.sqrt(n),
+        n / max(1, len(sentences)),
+    ]
+
+
+def score_features(features):
+    """
+    Provisional content and clarity scores (1-10) for a batch of feature rows.
+
+    Parameters:
+    - features: Array of shape (answers, 6) from answer_features
+
+    Returns:
+    - Integer array of shape (answers, 2): content, clarity
+    """
+    features = np.asarray(features, dtype=float).reshape(-1, 6)
+    words, star, coverage, filler_rate, diversity, sentence_words = features.T
+
+    length = np.clip(words / TARGET_ANSWER_WORDS, 0, 1)
+    # Without known keywords, content rests on length and structure alone
+    has_keywords = ~np.isnan(coverage)
+    content = np.where(
+        has_keywords,
+        0.35 * length + 0.3 * star + 0.35 * np.nan_to_num(coverage),
+        0.55 * length + 0.45 * star,
+    )
+
+    low, high = CLEAR_SENTENCE_WORDS
+    outside = np.maximum(0, np.maximum(low - sentence_words, sentence_words - high))
+    sentence_fit = np.clip(1 - outside / high, 0, 1)
+    clarity = (0.4 * np.clip(1 - filler_rate * 10, 0, 1)
+               + 0.3 * np.clip(diversity / 8, 0, 1)
+               + 0.3 * sentence_fit)
+    # Very short answers can't be clear about much
+    clarity = clarity * np.clip(words / 30, 0.3, 1)
+
+    scores = 1 + 9 * np.stack([content, clarity], axis=1)
+    return np.clip(np.rint(scores), 1, 10).astype(int)
+
+
+def question_keywords(question):
+    """Content words of a question, used when no keywords have been learned for it"""
+    words = _WORD_RE.findall(question.lower())
+    return [w for w in dict.fromkeys(words) if w not in _STOPWORDS and len(w) > 2]
+
+
+_keyword_cache = None
+
+
+def _keywords_store():
+    global _keyword_cache
+    if _keyword_cache is None:
+        try:
+            _keyword_cache = PersistentCache("question_keywords", max_entries=5000)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Question keyword store disabled: {str(e)}")
+            _keyword_cache = False
+    return _keyword_cache
+
+
+def learned_keywords(question):
+    """Keywords from earlier evaluations of this question, or [] if none were stored"""
+    store = _keywords_store()
+    return (store.get(content_hash(question)) or []) if store else []
+
+
+def remember_keywords(question, keywords):
+    """Store the evaluation's keywords for a question so later provisional scores can use them"""
+    store = _keywords_store()
+    if store and keywords:
+        store.set(content_hash(question), list(keywords))
+
+
+def provisional_scores(question, answer, keywords=None):
+    """
+    Instant content/clarity/overall scores for an answer, before the model has replied.
+
+    Parameters:
+    - question: The interview question
+    - answer: The candidate's answer
+    - keywords: Keywords a strong answer should mention; defaults to ones learned
+      from earlier evaluations of the question, then to the question's own words
+
+    Returns:
+    - Dictionary with "content", "clarity" and "overall" scores from 1 to 10
+    """
+    if keywords is None:
+        keywords = learned_keywords(question) or question_keywords(question)
+    content, clarity = score_features([answer_features(answer, keywords)])[0]
+    return {
+        "content": int(content),
+        "clarity": int(clarity),
+        "overall": int(round((content + clarity) / 2)),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import random
+    import time
+    from session_model import SESSION_HISTORY_DIR
+
+    # Stored answers from offloaded session history, topped up with synthetic ones
+    stored = []
+    for path in SESSION_HISTORY_DIR.glob("*.jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                stored.extend(
+                    (q["question"], a) for q, a in zip(entry["questions"], entry["answers"]) if a
+                )
+
+    random.seed(7)
+    phrases = [p for markers in STAR_MARKERS.values() for p in markers] + FILLER_PHRASES + (
+        "the system database users deployment testing performance design stakeholders "
+        "we shipped it and then i handled the rest of the work for the team"
+    ).split()
+    question = "Describe a challenging technical problem you solved recently."
+    while len(stored) < 5000:
+        sentences = [" ".join(random.choices(phrases, k=random.randint(5, 25))) for _ in range(random.randint(1, 8))]
+        stored.append((question, ". ".join(sentences) + "."))
+
+    start = time.perf_counter()
+    features = [answer_features(a, question_keywords(q)) for q, a in stored]
+    extracted = time.perf_counter()
+    scores = score_features(features)
+    elapsed = time.perf_counter() - start
+
+    print(f"Answers: {len(stored)}")
+    print(f"Features: {(extracted - start) / len(stored) * 1000:.3f} ms/answer, "
+          f"scoring: {(elapsed - (extracted - start)) * 1000:.2f} ms for the batch")
+    print(f"Total: {elapsed:.2f}s, {len(stored) / elapsed:.0f} answers/s")
+    print(f"Mean content {scores[:, 0].mean():.1f}, mean clarity {scores[:, 1].mean():.1f}")
@@ -0,0 +1,252 @@
+import json
+import re
+
+# Upper bound on how many times a truncated reply is cut back to its last comma
+MAX_REPAIR_CUTS = 8
+
+# Token budget for a follow-up that only asks for the missing fields
+REASK_MAX_TOKENS = 300
+
+_FENCE = re.compile(r"```[a-zA-Z]*")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+# Placeholders shown to the model when it is asked again for specific fields
+_TYPE_HINTS = {int: "<integer>", float: "<number>", str: "<string>"}
+
+
+def _scan(text):
+    """
+    Walk JSON-ish text tracking strings and brackets.
+
+    Returns:
+    - (end, closers, in_string): end is the index just past the first complete
+      top-level value (or None if the text stops before it closes), closers are
+      the brackets still open at the end of the text
+    """
+    stack = []
+    in_string = False
+    escape = False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]" and stack and c == stack[-1]:
+            stack.pop()
+            if not stack:
+                return i + 1, "", False
+    return None, "".join(reversed(stack)), in_string
+
+
+def _loads(candidate):
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            return json.loads(attempt)
+        except ValueError:
+            pass
+    return None
+
+
+def extract_json(text):
+    """
+    Pull the first JSON object or array out of a model reply.
+
+    Tolerates code fences and prose around the JSON, trailing commas, curly
+    quotes, and replies cut off by max_tokens (open strings and brackets are
+    closed, dropping the incomplete last member if needed).
+
+    Returns:
+    - The decoded value, or None if nothing usable was found
+    """
+    if not text:
+        return None
+    text = _FENCE.sub("", text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    fragment = text[min(starts):]
+
+    for source in (fragment, fragment.translate(_SMART_QUOTES)):
+        end, _, _ = _scan(source)
+        if end is not None:
+            value = _loads(source[:end])
+            if value is not None:
+                return value
+            continue
+
+        # Truncated reply: close what is open, cutting back a member at a time
+        for _ in range(MAX_REPAIR_CUTS):
+            _, closers, in_string = _scan(source)
+            value = _loads(source + ('"' if in_string else "") + closers)
+            if value is not None:
+                return value
+            cut = source.rfind(",")
+            if cut <= 0:
+                break
+            source = source[:cut]
+    return None
+
+
+def _coerce(value, spec):
+    """Convert value to match spec, or return None if it can't be made to fit"""
+    if spec is int or spec is float:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            number = value
+        elif isinstance(value, str) and _NUMBER.search(value):
+            # "7", "7/10" and "about 7" all mean 7
+            number = float(_NUMBER.search(value).group())
+        else:
+            return None
+        return int(round(number)) if spec is int else float(number)
+    if spec is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return None
+    if isinstance(spec, list):
+        if isinstance(value, str):
+            value = [value] if value.strip() else []
+        if not isinstance(value, list):
+            return None
+        items = (_coerce(item, spec[0]) for item in value)
+        return [item for item in items if item is not None]
+    if isinstance(spec, dict) and len(spec) == 1 and str in spec:
+        # {str: type} is a free-form mapping, e.g. skill name -> level
+        if not isinstance(value, dict):
+            return None
+        items = ((str(k), _coerce(v, spec[str])) for k, v in value.items())
+        return {k: v for k, v in items if v is not None}
+    if isinstance(spec, dict):
+        return value if isinstance(value, dict) else None
+    return None
+
+
+def validate(data, schema, _prefix=""):
+    """
+    Check decoded JSON against a schema, keeping every field that fits.
+
+    A schema is a dict of field name -> spec, where a spec is int, float, str,
+    [item spec] for a list, {str: value spec} for a free-form mapping, or a
+    nested schema dict.
+
+    Returns:
+    - (valid, missing): the coerced fields that matched, and the dotted paths
+      of fields that were absent or unusable
+    """
+    if not isinstance(data, dict):
+        data = {}
+    valid = {}
+    missing = []
+    for key, spec in schema.items():
+        path = f"{_prefix}{key}"
+        is_object = isinstance(spec, dict) and not (len(spec) == 1 and str in spec)
+        value = _coerce(data.get(key), spec) if key in data else None
+        if is_object:
+            nested, nested_missing = validate(value, spec, f"{path}.")
+            if nested:
+                valid[key] = nested
+            missing.extend(nested_missing)
+        elif value is None:
+            missing.append(path)
+        else:
+            valid[key] = value
+    return valid, missing
+
+
+def subschema(schema, paths):
+    """The part of schema covering only the given dotted paths"""
+    partial = {}
+    for path in paths:
+        head, _, rest = path.partition(".")
+        if head not in schema:
+            continue
+        if rest:
+            partial[head] = {**partial.get(head, {}), **subschema(schema[head], [rest])}
+        else:
+            partial[head] = schema[head]
+    return partial
+
+
+def template(schema):
+    """A JSON skeleton for schema with type placeholders, for prompts"""
+    def render(spec):
+        if isinstance(spec, list):
+            return [render(spec[0])]
+        if isinstance(spec, dict) and len(spec) == 1 and str in spec:
+            return {"<name>": render(spec[str])}
+        if isinstance(spec, dict):
+            return {key: render(value) for key, value in spec.items()}
+        return _TYPE_HINTS.get(spec, "<value>")
+    return json.dumps(render(schema), indent=2)
+
+
+def merge(base, extra):
+    """Deep-merge extra into a copy of base; extra only fills what base lacks"""
+    merged = dict(base)
+    for key, value in extra.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged.setdefault(key, value)
+    return merged
+
+
+def with_defaults(data, schema):
+    """Fill fields still missing after validation with empty values of the right type"""
+    filled = dict(data)
+    for key, spec in schema.items():
+        is_object = isinstance(spec, dict) and not (len(spec) == 1 and str in spec)
+        if is_object:
+            filled[key] = with_defaults(filled.get(key, {}), spec)
+        elif key not in filled:
+            filled[key] = [] if isinstance(spec, list) else {} if isinstance(spec, dict) else spec()
+    return filled
+
+
+def reask_prompt(schema, missing):
+    """Follow-up prompt asking the model for just the missing fields"""
+    return (
+        "Your previous reply was missing or had invalid values for: "
+        f"{', '.join(missing)}. Reply with only this JSON, filled in:\n"
+        f"{template(subschema(schema, missing))}"
+    )
+
+
+def parse_structured(reply, schema, reask=None):
+    """
+    Parse a model reply into schema-checked JSON, asking again only for gaps.
+
+    Parameters:
+    - reply: The model's reply text
+    - schema: Expected fields (see validate)
+    - reask: Optional callable taking a follow-up prompt and returning the
+      model's reply to it (or None); called at most once, and only when some
+      fields are missing
+
+    Returns:
+    - (data, missing): the valid fields and the dotted paths still missing
+    """
+    data, missing = validate(extract_json(reply), schema)
+    if missing and reask is not None:
+        try:
+            follow_up = reask(reask_prompt(schema, missing))
+        except Exception as e:
+            print(f"Error re-asking for missing fields: {str(e)}")
+            follow_up = None
+        if follow_up:
+            extra, _ = validate(extract_json(follow_up), subschema(schema, missing))
+            data, missing = validate(merge(data, extra), schema)
+    return data, missing
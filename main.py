@@ -1,8 +1,5 @@
 import streamlit as st
-import os
-import tempfile
 import numpy as np
-import time
 import json
 from pathlib import Path
 from faster_whisper import WhisperModel
@@ -18,7 +15,23 @@ import google.auth
 import re
 # Import the answer evaluation module
 from answer_evaluation import get_answer_evaluation, save_evaluation_data, calculate_aggregate_scores, aggregate_skill_assessment, generate_career_insights
+from heuristic_scoring import provisional_scores
+from delivery_metrics import segment_words, compute_delivery_metrics, describe_delivery
+from audio_preprocessing import preprocess_recording, sniff_format, COMPRESSED_AUDIO_TYPES
+from parallel_transcription import transcribe_samples, model_threads, TRANSCRIBE_WORKERS
+from transcript_cache import TranscriptCache, transcript_key
+from speech_service import SpeechServiceClient, SpeechServiceError, FallbackTTSClient
+from tts_encoding import negotiate_encoding, record_tts_size, AUDIO_MIME_TYPES, TTS_SAMPLE_RATE_HERTZ
 import career_coach
+from question_bank import get_question_bank
+from adaptive_selection import select_next_question
+from speech_prefetch import SpeechPrefetcher, PREFETCH_LOOKAHEAD
+from tts_batch import synthesize_batch, can_encode_clips
+from tts_templates import SegmentCache, templated_intro_audio, intro_text, TTS_TEMPLATED_INTRO
+from session_model import build_history_entry, record_history, record_session_memory
+from session_checkpoint import create_checkpoint_store, save_checkpoint, restore_checkpoint
+from functools import partial
+import uuid
 
 # The page config MUST be the first Streamlit command used in your app
 st.set_page_config(
@@ -67,6 +80,8 @@ if "audio_data" not in st.session_state:
     st.session_state.audio_data = None
 if "transcription" not in st.session_state:
     st.session_state.transcription = ""
+if "delivery_metrics" not in st.session_state:
+    st.session_state.delivery_metrics = None
 if "session_history" not in st.session_state:
     st.session_state.session_history = []
 if "use_gpu" not in st.session_state:
@@ -103,20 +118,72 @@ if "personalized_questions" not in st.session_state:
     st.session_state.personalized_questions = []
 if "career_recommendations" not in st.session_state:
     st.session_state.career_recommendations = []
+if "adaptive_questions" not in st.session_state:
+    st.session_state.adaptive_questions = False
+if "adaptive_seed" not in st.session_state:
+    st.session_state.adaptive_seed = 0
+if "tts_prefetch" not in st.session_state:
+    st.session_state.tts_prefetch = SpeechPrefetcher()
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "interview_id" not in st.session_state:
+    st.session_state.interview_id = None
 
+# Checkpoint store shared by all sessions in this worker
 @st.cache_resource
-def load_whisper_model():
-    model_size = "small" if st.session_state.get("faster_transcription", True) else "medium"
+def get_checkpoint_store():
+    return create_checkpoint_store()
+
+# Persist interview progress so any worker can resume this session
+def checkpoint_session():
+    save_checkpoint(get_checkpoint_store(), st.session_state.session_id, st.session_state)
+
+# On a new session, resume from the checkpoint named by the session token in the URL
+if "checkpoint_checked" not in st.session_state:
+    st.session_state.checkpoint_checked = True
+    session_token = st.query_params.get("session", "")
+    # Tokens are our own uuid4 hex IDs; anything else is ignored
+    if re.fullmatch(r"[0-9a-f]{32}", session_token) and restore_checkpoint(get_checkpoint_store(), session_token, st.session_state):
+        st.session_state.session_id = session_token
+    else:
+        st.query_params["session"] = st.session_state.session_id
+
+# Track per-session memory so growth shows up in the worker logs
+record_session_memory(st.session_state.session_id, st.session_state)
+
+def whisper_model_size():
+    return "small" if st.session_state.get("faster_transcription", True) else "medium"
+
+def whisper_device():
     device = "cuda" if st.session_state.get("use_gpu", False) else "cpu"
     compute_type = "float16" if device == "cuda" else "int8"
-    return WhisperModel(model_size, device=device, compute_type=compute_type)
+    return device, compute_type
+
+@st.cache_resource
+def load_whisper_model():
+    model_size = whisper_model_size()
+    device, compute_type = whisper_device()
+    # One copy of the weights; each worker runs one answer or chunk on its share of the cores
+    return WhisperModel(model_size, device=device, compute_type=compute_type,
+                        cpu_threads=model_threads(),
+                        num_workers=TRANSCRIBE_WORKERS)
+
+# Handle on the per-host speech sidecar (speech_service.py); used whenever it is running
+@st.cache_resource
+def get_speech_service():
+    return SpeechServiceClient()
+
+# Transcripts by recording, shared by all sessions in this worker
+@st.cache_resource
+def get_transcript_cache():
+    return TranscriptCache()
 
 # Get the TTS client with proper caching
 @st.cache_resource
 def get_tts_client():
     global tts_client
     if tts_client:
-        return tts_client
+        return FallbackTTSClient(get_speech_service(), tts_client)
     
     try:
         # If not initialized yet, try to load from secrets
@@ -124,30 +191,55 @@ def get_tts_client():
         tts_credentials_info = json.loads(tts_creds_raw)
         tts_credentials = service_account.Credentials.from_service_account_info(tts_credentials_info)
         tts_client = texttospeech.TextToSpeechClient(credentials=tts_credentials)
-        return tts_client
+        # Synthesis goes through the sidecar's shared cache when it is running
+        return FallbackTTSClient(get_speech_service(), tts_client)
     except Exception as e:
         st.error(f"Error initializing Google Cloud TTS client: {str(e)}")
         return None
 
-# Function to generate speech from text using Google Cloud TTS
-def text_to_speech(text):
-    client = get_tts_client()
-    if not client:
-        raise Exception("Failed to initialize Google Cloud TTS client")
-    
+# v1beta1 client for batched synthesis; only that API reports SSML mark timepoints
+@st.cache_resource
+def get_tts_batch_client():
+    try:
+        from google.cloud import texttospeech_v1beta1
+        tts_credentials_info = json.loads(st.secrets["GOOGLE_TTS_CREDENTIALS_JSON"])
+        tts_credentials = service_account.Credentials.from_service_account_info(tts_credentials_info)
+        return FallbackTTSClient(
+            get_speech_service(), texttospeech_v1beta1.TextToSpeechClient(credentials=tts_credentials)
+        )
+    except Exception as e:
+        print(f"Batched TTS unavailable: {str(e)}")
+        return None
+
+# Encoding negotiated once per session from the browser's user agent
+def get_tts_encoding():
+    if "tts_encoding" not in st.session_state:
+        user_agent = ""
+        try:
+            from streamlit.web.server.websocket_headers import _get_websocket_headers
+            user_agent = (_get_websocket_headers() or {}).get("User-Agent", "")
+        except Exception as e:
+            print(f"Could not read request headers: {str(e)}")
+        st.session_state.tts_encoding = negotiate_encoding(user_agent)
+    return st.session_state.tts_encoding
+
+# Synthesize speech with Google Cloud TTS and return the encoded audio bytes.
+# This doesn't touch st.session_state, so it is safe to run on prefetch threads.
+def synthesize_speech(client, text, voice_name, encoding="MP3"):
     # Set the text input to be synthesized
     synthesis_input = texttospeech.SynthesisInput(text=text)
     
     # Build the voice request
     voice = texttospeech.VoiceSelectionParams(
         language_code="en-US",
-        name=st.session_state.voice_type,
+        name=voice_name,
         ssml_gender=texttospeech.SsmlVoiceGender.MALE
     )
     
     # Select the type of audio file
     audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
+        audio_encoding=texttospeech.AudioEncoding[encoding],
+        sample_rate_hertz=TTS_SAMPLE_RATE_HERTZ,  # Plenty for speech, and much smaller
         speaking_rate=0.95,  # Slightly slower for interview questions
         pitch=0.0,  # Natural pitch
         volume_gain_db=1.0  # Slightly louder
@@ -157,18 +249,89 @@ def text_to_speech(text):
     response = client.synthesize_speech(
         input=synthesis_input, voice=voice, audio_config=audio_config
     )
+    return response.audio_content
+
+# Function to generate speech from text using Google Cloud TTS
+def text_to_speech(text):
+    client = get_tts_client()
+    if not client:
+        raise Exception("Failed to initialize Google Cloud TTS client")
+    
+    # Use audio prefetched in the background if there is any
+    voice_name = st.session_state.voice_type
+    encoding = get_tts_encoding()
+    audio_content = st.session_state.tts_prefetch.take(text, voice_name)
+    if audio_content is None:
+        audio_content = synthesize_speech(client, text, voice_name, encoding)
+    record_tts_size(voice_name, encoding, len(audio_content))
     
     # Return the audio content as a BytesIO object
-    fp = BytesIO(response.audio_content)
+    fp = BytesIO(audio_content)
     fp.seek(0)
     return fp
 
+# Phrase audio shared by every session in this worker
+@st.cache_resource
+def get_tts_segment_cache():
+    return SegmentCache()
+
+# Speak the introduction from cached phrases, synthesizing only the candidate's name
+def intro_to_speech(name, job_role):
+    encoding = get_tts_encoding()
+    # Spliced PCM needs ffmpeg to reach the negotiated encoding; otherwise speak it whole
+    if TTS_TEMPLATED_INTRO and can_encode_clips(encoding):
+        client = get_tts_client()
+        voice_name = st.session_state.voice_type
+        try:
+            audio_content = templated_intro_audio(
+                client, get_tts_segment_cache(), name, job_role, voice_name, encoding, TTS_SAMPLE_RATE_HERTZ
+            )
+            record_tts_size(voice_name, encoding, len(audio_content))
+            return BytesIO(audio_content)
+        except Exception as e:
+            print(f"Templated introduction failed, synthesizing it whole: {str(e)}")
+    return text_to_speech(intro_text(name, job_role))
+
+# Start synthesizing a question in the background so it plays instantly when reached
+def prefetch_question_audio(text):
+    if not st.session_state.use_voice:
+        return
+    client = get_tts_client()
+    if client:
+        st.session_state.tts_prefetch.prefetch(
+            partial(synthesize_speech, client, encoding=get_tts_encoding()), text, st.session_state.voice_type
+        )
+
+# Prefetch audio for the questions after the current one
+def prefetch_upcoming_questions(current_idx):
+    # In adaptive mode only the next slot is settled; later ones will still change
+    lookahead = 1 if st.session_state.adaptive_questions else PREFETCH_LOOKAHEAD
+    for upcoming in st.session_state.questions[current_idx + 1:current_idx + 1 + lookahead]:
+        prefetch_question_audio(upcoming["question"])
+
+# Synthesize every question of the interview in one request while the introduction plays
+def prefetch_interview_questions():
+    client = get_tts_batch_client()
+    # Adaptive slots change as the interview goes, so only the first one is settled
+    if st.session_state.adaptive_questions or not client or not can_encode_clips(get_tts_encoding()):
+        prefetch_upcoming_questions(-1)
+        return
+    st.session_state.tts_prefetch.prefetch_batch(
+        partial(synthesize_batch, client, encoding=get_tts_encoding(), sample_rate=TTS_SAMPLE_RATE_HERTZ),
+        [q["question"] for q in st.session_state.questions],
+        st.session_state.voice_type
+    )
+
 # Function to create an HTML audio player with autoplay for TTS
-def autoplay_audio(audio_bytes):
+def autoplay_audio(audio_bytes, mime_type=None):
+    if mime_type is None:
+        # Batched clips are plain WAV when they couldn't be re-encoded
+        is_wav = sniff_format(audio_bytes.getvalue()[:12]) == "wav"
+        mime_type = AUDIO_MIME_TYPES["LINEAR16" if is_wav else get_tts_encoding()]
     b64 = base64.b64encode(audio_bytes.read()).decode()
     md = f"""
         <audio autoplay="true">
-        <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
+        <source src="data:{mime_type};base64,{b64}" type="{mime_type}">
         </audio>
         """
     st.markdown(md, unsafe_allow_html=True)
@@ -197,466 +360,10 @@ def get_firebase_credentials():
 
 # The rest of your code follows...
  
-# Enhanced Question Bank for Interview Agent
-# Replace the existing JOB_FIELDS dictionary in your code with this expanded version
-
-JOB_FIELDS = {
-    "Software Engineering": {
-        "Technical": [
-            "Explain the difference between arrays and linked lists.",
-            "What's your approach to debugging a complex issue?",
-            "Describe a challenging technical problem you solved recently.",
-            "Explain the concept of time and space complexity.",
-            "What design patterns have you used in your projects?",
-            "How do you ensure your code is maintainable and scalable?",
-            "Explain how you would implement error handling in a distributed system.",
-            "What's the difference between SQL and NoSQL databases?",
-            "How would you optimize a slow database query?",
-            "Explain the concept of RESTful APIs and their principles.",
-            "What's the difference between synchronous and asynchronous programming?",
-            "How do you handle memory management in your preferred language?",
-            "Explain the concept of dependency injection.",
-            "What's the difference between unit testing and integration testing?",
-            "How would you implement caching in a web application?",
-            "Explain the CAP theorem and its implications.",
-            "What's the difference between horizontal and vertical scaling?",
-            "How do you ensure thread safety in concurrent programming?",
-            "Explain the concept of microservices architecture.",
-            "What's your approach to code versioning and branching strategies?",
-            "How would you design a URL shortener like bit.ly?",
-            "Explain the difference between authentication and authorization.",
-            "What's the purpose of containerization and how have you used it?",
-            "How do you handle API rate limiting?",
-            "Explain the concept of load balancing.",
-            "What's your experience with message queues?",
-            "How would you implement real-time features in a web application?",
-            "Explain the concept of database normalization.",
-            "What's the difference between stateful and stateless applications?",
-            "How do you approach performance profiling and optimization?"
-        ],
-        "Behavioral": [
-            "Tell me about a time you had to work under pressure to meet a deadline.",
-            "Describe a situation where you disagreed with a team member on a technical approach.",
-            "How do you handle feedback on your code during code reviews?",
-            "Tell me about a time you identified and fixed a bug that others couldn't solve.",
-            "How do you keep up with the latest technologies and programming languages?",
-            "Describe a time when you had to learn a new technology quickly.",
-            "Tell me about a project that didn't go as planned and how you handled it.",
-            "How do you prioritize tasks when working on multiple projects?",
-            "Describe a time when you had to explain a complex technical concept to a non-technical person.",
-            "Tell me about a time you received constructive criticism on your work.",
-            "How do you handle working with legacy code?",
-            "Describe a situation where you had to make a difficult technical decision.",
-            "Tell me about a time you mentored a junior developer.",
-            "How do you approach working in a team with different skill levels?",
-            "Describe a time when you had to refactor a large codebase.",
-            "Tell me about a mistake you made in your code and how you learned from it.",
-            "How do you handle tight deadlines without compromising code quality?",
-            "Describe a time when you had to work with a difficult stakeholder.",
-            "Tell me about a time you improved team productivity or processes.",
-            "How do you stay motivated during long, challenging projects?"
-        ],
-        "Role-specific": [
-            "How do you approach testing your code?",
-            "Describe your experience with CI/CD pipelines.",
-            "How do you balance technical debt with delivering features?",
-            "Explain your approach to optimizing application performance.",
-            "How would you explain a complex technical concept to a non-technical stakeholder?",
-            "What's your experience with agile development methodologies?",
-            "How do you ensure security best practices in your code?",
-            "Describe your approach to documentation and knowledge sharing.",
-            "How do you handle production incidents and post-mortems?",
-            "What's your experience with cloud platforms and services?",
-            "How do you approach capacity planning for applications?",
-            "Describe your experience with monitoring and observability tools.",
-            "How do you handle database migrations and schema changes?",
-            "What's your approach to API design and versioning?",
-            "How do you ensure accessibility in web applications?",
-            "Describe your experience with mobile development considerations.",
-            "How do you approach internationalization and localization?",
-            "What's your experience with DevOps practices?",
-            "How do you handle cross-browser compatibility issues?",
-            "Describe your approach to technical leadership and decision-making."
-        ]
-    },
-    "Data Science/Analysis": {
-        "Technical": [
-            "Explain the difference between supervised and unsupervised learning.",
-            "How do you handle missing data in a dataset?",
-            "Describe a data cleaning process you've implemented.",
-            "What statistical methods do you use to validate your findings?",
-            "Explain the concept of overfitting and how to avoid it.",
-            "How would you approach feature selection for a machine learning model?",
-            "Explain the difference between correlation and causation with an example.",
-            "What's the difference between precision and recall?",
-            "How do you handle imbalanced datasets?",
-            "Explain the bias-variance tradeoff.",
-            "What's your approach to cross-validation?",
-            "How do you evaluate the performance of a regression model?",
-            "Explain the concept of regularization in machine learning.",
-            "What's the difference between bagging and boosting?",
-            "How do you handle categorical variables in machine learning?",
-            "Explain the concept of dimensionality reduction.",
-            "What's your experience with time series analysis?",
-            "How do you approach outlier detection and treatment?",
-            "Explain the concept of ensemble methods.",
-            "What's the difference between parametric and non-parametric models?",
-            "How do you handle data leakage in machine learning?",
-            "Explain the concept of feature engineering.",
-            "What's your approach to model selection and hyperparameter tuning?",
-            "How do you handle multi-collinearity in regression models?",
-            "Explain the concept of clustering and its applications.",
-            "What's your experience with deep learning frameworks?",
-            "How do you approach natural language processing tasks?",
-            "Explain the concept of recommendation systems.",
-            "What's your experience with big data technologies?",
-            "How do you approach experiment design and A/B testing?"
-        ],
-        "Behavioral": [
-            "Tell me about a time when your data analysis led to a significant business decision.",
-            "How do you communicate complex data insights to non-technical stakeholders?",
-            "Describe a situation where you had to defend your analytical approach.",
-            "Tell me about a project where you had to work with messy or incomplete data.",
-            "How do you ensure your analysis is accurate and reliable?",
-            "Describe a time when your initial hypothesis was proven wrong by the data.",
-            "Tell me about a challenging data problem you solved creatively.",
-            "How do you handle conflicting requirements from different stakeholders?",
-            "Describe a time when you had to work under tight deadlines on a data project.",
-            "Tell me about a time you had to learn a new analytical tool or technique quickly.",
-            "How do you approach working with domain experts who aren't data-savvy?",
-            "Describe a situation where you found an unexpected pattern in data.",
-            "Tell me about a time you had to present negative or disappointing results.",
-            "How do you handle situations where data quality is poor?",
-            "Describe a time when you had to balance speed vs. accuracy in analysis.",
-            "Tell me about a project where you had to collaborate with multiple teams.",
-            "How do you stay current with new developments in data science?",
-            "Describe a time when you had to question the data collection process.",
-            "Tell me about a mistake you made in analysis and how you corrected it.",
-            "How do you approach ethical considerations in data science?"
-        ],
-        "Role-specific": [
-            "What visualization tools do you prefer and why?",
-            "How do you determine which statistical test to use for a given problem?",
-            "Describe your approach to A/B testing.",
-            "How do you translate business questions into data queries?",
-            "What metrics would you track to measure the success of a product feature?",
-            "How do you approach data governance and privacy considerations?",
-            "Describe your experience with cloud-based analytics platforms.",
-            "How do you handle version control for data science projects?",
-            "What's your approach to model deployment and monitoring?",
-            "How do you ensure reproducibility in your analysis?",
-            "Describe your experience with real-time data processing.",
-            "How do you approach feature stores and ML operations?",
-            "What's your experience with automated machine learning tools?",
-            "How do you handle data pipeline failures and monitoring?",
-            "Describe your approach to data storytelling and presentation.",
-            "How do you work with data engineers and other technical teams?",
-            "What's your experience with customer segmentation and targeting?",
-            "How do you approach predictive modeling for business outcomes?",
-            "Describe your experience with dashboard design and KPI tracking.",
-            "How do you validate and test machine learning models in production?"
-        ]
-    },
-    "Project Management": {
-        "Technical": [
-            "What project management methodologies are you familiar with?",
-            "How do you create and maintain a project schedule?",
-            "Describe your approach to risk management.",
-            "How do you track and report project progress?",
-            "What tools do you use for project planning and why?",
-            "How do you handle resource allocation in a project?",
-            "Explain how you would manage scope creep.",
-            "What's your experience with agile project management?",
-            "How do you approach project budgeting and cost control?",
-            "Describe your experience with waterfall methodology.",
-            "How do you handle dependencies between different project tasks?",
-            "What's your approach to quality assurance in projects?",
-            "How do you manage project documentation and knowledge transfer?",
-            "Describe your experience with project portfolio management.",
-            "How do you approach change management in projects?",
-            "What's your experience with remote project team management?",
-            "How do you handle project communication and reporting?",
-            "Describe your approach to vendor and contractor management.",
-            "How do you ensure project deliverables meet requirements?",
-            "What's your experience with project management software and tools?",
-            "How do you approach project closure and lessons learned?",
-            "Describe your experience with cross-functional project teams.",
-            "How do you handle project governance and compliance requirements?",
-            "What's your approach to project estimation and planning?",
-            "How do you manage project integration and coordination?"
-        ],
-        "Behavioral": [
-            "Tell me about a time when a project was falling behind schedule.",
-            "Describe how you've managed stakeholder expectations.",
-            "How do you motivate team members during challenging phases of a project?",
-            "Tell me about a project that failed and what you learned from it.",
-            "How do you handle conflicts between team members or departments?",
-            "Describe a time when you had to make a difficult decision under pressure.",
-            "Tell me about a situation where project requirements changed significantly.",
-            "How do you handle team members who are not meeting expectations?",
-            "Describe a time when you had to manage a project with limited resources.",
-            "Tell me about a time you had to communicate bad news to stakeholders.",
-            "How do you handle working with difficult or unresponsive team members?",
-            "Describe a situation where you had to negotiate with vendors or contractors.",
-            "Tell me about a time you had to manage multiple competing priorities.",
-            "How do you handle situations where stakeholders have conflicting requirements?",
-            "Describe a time when you successfully turned around a failing project.",
-            "Tell me about a situation where you had to work with a tight deadline.",
-            "How do you approach building relationships with new team members?",
-            "Describe a time when you had to present project results to senior management.",
-            "Tell me about a situation where you had to adapt your management style.",
-            "How do you handle stress and maintain team morale during difficult projects?"
-        ],
-        "Role-specific": [
-            "How do you prioritize competing deadlines across multiple projects?",
-            "Describe how you communicate project status to different audiences.",
-            "How do you ensure quality deliverables while maintaining timelines?",
-            "What's your approach to gathering requirements from stakeholders?",
-            "How do you manage project budgets and resources?",
-            "Describe your experience with project risk assessment and mitigation.",
-            "How do you handle project team development and training?",
-            "What's your approach to project metrics and KPI tracking?",
-            "How do you manage project scope and prevent scope creep?",
-            "Describe your experience with client or customer-facing projects.",
-            "How do you approach project retrospectives and continuous improvement?",
-            "What's your experience with regulatory or compliance-driven projects?",
-            "How do you handle project escalation and issue resolution?",
-            "Describe your approach to project resource planning and allocation.",
-            "How do you manage project timelines when working with external dependencies?",
-            "What's your experience with digital transformation or technology projects?",
-            "How do you approach stakeholder analysis and engagement planning?",
-            "Describe your experience with project procurement and contract management.",
-            "How do you ensure effective knowledge transfer at project completion?",
-            "What's your approach to managing project risks and assumptions?"
-        ]
-    },
-    "UX/UI Design": {
-        "Technical": [
-            "Walk me through your design process.",
-            "How do you approach user research?",
-            "Describe how you create and use personas.",
-            "What tools do you use for wireframing and prototyping?",
-            "How do you incorporate accessibility into your designs?",
-            "Explain the importance of design systems.",
-            "How do you use data to inform design decisions?",
-            "What's your experience with usability testing?",
-            "How do you approach information architecture?",
-            "Describe your experience with interaction design.",
-            "How do you ensure consistency across different platforms?",
-            "What's your approach to mobile-first design?",
-            "How do you handle design for different screen sizes and devices?",
-            "Describe your experience with design thinking methodology.",
-            "How do you approach color theory and typography in your designs?",
-            "What's your experience with motion design and micro-interactions?",
-            "How do you conduct competitive analysis for design projects?",
-            "Describe your approach to creating user journey maps.",
-            "How do you handle design handoff to developers?",
-            "What's your experience with A/B testing for design decisions?",
-            "How do you approach designing for accessibility and inclusion?",
-            "Describe your experience with design research and validation.",
-            "How do you create and maintain design documentation?",
-            "What's your approach to cross-browser and cross-platform compatibility?",
-            "How do you handle design feedback and iteration cycles?"
-        ],
-        "Behavioral": [
-            "Tell me about a time when you received difficult feedback on your design.",
-            "Describe a situation where you had to compromise on a design decision.",
-            "How do you advocate for the user when there are business constraints?",
-            "Tell me about a design challenge you faced and how you overcame it.",
-            "How do you collaborate with developers to implement your designs?",
-            "Describe a time when user research contradicted your initial design assumptions.",
-            "Tell me about a project where you had to work with tight deadlines.",
-            "How do you handle conflicting feedback from different stakeholders?",
-            "Describe a situation where you had to design for a user group you weren't familiar with.",
-            "Tell me about a time you had to defend your design decisions.",
-            "How do you approach working with stakeholders who don't understand UX?",
-            "Describe a time when you had to pivot your design approach mid-project.",
-            "Tell me about a situation where technical constraints limited your design options.",
-            "How do you handle situations where business goals conflict with user needs?",
-            "Describe a time when you successfully influenced a product decision through design.",
-            "Tell me about a project where you had to work with limited resources.",
-            "How do you approach learning about new user groups or industries?",
-            "Describe a time when you had to present your design to senior executives.",
-            "Tell me about a situation where you had to work with an existing design system.",
-            "How do you handle criticism of your design work?"
-        ],
-        "Role-specific": [
-            "How do you measure the success of a design?",
-            "Describe how you stay current with design trends and best practices.",
-            "How do you balance aesthetics with usability?",
-            "Explain your approach to responsive design.",
-            "How would you improve the user experience of our product?",
-            "What's your experience with design systems and component libraries?",
-            "How do you approach user onboarding and first-time user experiences?",
-            "Describe your experience with e-commerce or conversion-focused design.",
-            "How do you handle designing for different user personas and use cases?",
-            "What's your approach to creating design specifications and guidelines?",
-            "How do you collaborate with product managers and stakeholders?",
-            "Describe your experience with design workshops and facilitation.",
-            "How do you approach designing for international or multicultural audiences?",
-            "What's your experience with voice user interfaces or emerging technologies?",
-            "How do you handle design version control and collaboration?",
-            "Describe your approach to creating design presentations and storytelling.",
-            "How do you ensure your designs align with brand guidelines?",
-            "What's your experience with design leadership and mentoring?",
-            "How do you approach designing for different business models?",
-            "Describe your experience with design operations and process improvement."
-        ]
-    },
-    "IT Support": {
-        "Technical": [
-            "Explain the difference between hardware and software troubleshooting.",
-            "How would you approach a user who can't connect to the internet?",
-            "Describe your experience with ticketing systems.",
-            "What steps would you take to secure a workstation?",
-            "How do you prioritize multiple support requests?",
-            "Explain how you would troubleshoot a slow computer.",
-            "What's your experience with network troubleshooting?",
-            "How do you approach mobile device support and management?",
-            "Describe your experience with Active Directory and user management.",
-            "How would you troubleshoot email connectivity issues?",
-            "What's your approach to software installation and deployment?",
-            "How do you handle printer and peripheral device issues?",
-            "Describe your experience with backup and recovery procedures.",
-            "How would you troubleshoot VPN connectivity problems?",
-            "What's your experience with cloud services support?",
-            "How do you approach virus and malware removal?",
-            "Describe your experience with remote desktop and support tools.",
-            "How would you handle a server outage or critical system failure?",
-            "What's your approach to password management and security?",
-            "How do you troubleshoot audio and video conferencing issues?",
-            "Describe your experience with software licensing and compliance.",
-            "How would you approach migrating user data to a new system?",
-            "What's your experience with mobile device management (MDM)?",
-            "How do you handle browser and web application issues?",
-            "Describe your approach to monitoring system performance and health."
-        ],
-        "Behavioral": [
-            "Tell me about a time when you had to explain a technical issue to a non-technical user.",
-            "Describe a situation where you went above and beyond for a user.",
-            "How do you handle frustrated or angry users?",
-            "Tell me about a time when you couldn't solve a technical problem immediately.",
-            "How do you stay patient when dealing with repetitive support issues?",
-            "Describe a time when you had to work under pressure to resolve a critical issue.",
-            "Tell me about a situation where you had to learn a new technology quickly.",
-            "How do you handle multiple urgent requests at the same time?",
-            "Describe a time when you had to escalate an issue to a higher level.",
-            "Tell me about a situation where you prevented a major issue from occurring.",
-            "How do you approach working with users who resist technology changes?",
-            "Describe a time when you had to work with a difficult colleague or vendor.",
-            "Tell me about a situation where you improved a support process.",
-            "How do you handle situations where you don't know the answer immediately?",
-            "Describe a time when you had to work overtime to resolve an issue.",
-            "Tell me about a situation where you had to communicate bad news to users.",
-            "How do you approach building rapport with new users or departments?",
-            "Describe a time when you had to train someone on a new system.",
-            "Tell me about a situation where you had to work independently without supervision.",
-            "How do you maintain your composure during high-stress situations?"
-        ],
-        "Role-specific": [
-            "What remote support tools are you familiar with?",
-            "How do you document your troubleshooting steps?",
-            "Describe your approach to user training and education.",
-            "How do you keep up with new technologies and support techniques?",
-            "What's your experience with supporting remote workers?",
-            "How do you approach preventive maintenance and system monitoring?",
-            "Describe your experience with help desk metrics and SLA management.",
-            "How do you handle escalation procedures and communication?",
-            "What's your approach to knowledge base creation and maintenance?",
-            "How do you ensure data security while providing support?",
-            "Describe your experience with asset management and inventory tracking.",
-            "How do you approach vendor relationships and support coordination?",
-            "What's your experience with change management and communication?",
-            "How do you handle emergency response and business continuity?",
-            "Describe your approach to user account provisioning and deprovisioning.",
-            "How do you ensure compliance with IT policies and procedures?",
-            "What's your experience with budget planning for IT support?",
-            "How do you approach cross-training and knowledge sharing?",
-            "Describe your experience with project work and implementations.",
-            "How do you measure and improve customer satisfaction in support?"
-        ]
-    },
-    "Cybersecurity": {
-        "Technical": [
-            "Explain the concept of defense in depth.",
-            "What's the difference between authentication and authorization?",
-            "How would you respond to a potential data breach?",
-            "Describe common network vulnerabilities and how to mitigate them.",
-            "What's your approach to vulnerability assessment?",
-            "Explain the importance of patch management.",
-            "How do you approach security incident response?",
-            "What's your experience with penetration testing?",
-            "Describe the CIA triad and its importance in security.",
-            "How would you implement a zero-trust security model?",
-            "What's your approach to security monitoring and SIEM tools?",
-            "Explain the concept of threat modeling.",
-            "How do you approach cloud security and configuration?",
-            "What's your experience with identity and access management?",
-            "Describe your approach to network segmentation and firewalls.",
-            "How would you secure a remote workforce?",
-            "What's your experience with encryption and key management?",
-            "Explain the concept of security by design.",
-            "How do you approach mobile device security?",
-            "What's your experience with compliance frameworks (SOX, HIPAA, etc.)?",
-            "Describe your approach to security risk assessment.",
-            "How would you handle a ransomware attack?",
-            "What's your experience with security automation and orchestration?",
-            "Explain the concept of threat intelligence and its applications.",
-            "How do you approach secure software development practices?"
-        ],
-        "Behavioral": [
-            "Tell me about a time when you identified a security risk before it became an issue.",
-            "How do you balance security needs with user convenience?",
-            "Describe a situation where you had to convince management to invest in security measures.",
-            "How do you stay current with evolving security threats?",
-            "Tell me about a time when you had to respond to a security incident.",
-            "Describe a situation where you had to work under pressure during a security crisis.",
-            "How do you approach educating non-technical staff about security?",
-            "Tell me about a time when you had to implement unpopular security policies.",
-            "Describe a situation where you discovered a security vulnerability.",
-            "How do you handle situations where security and business objectives conflict?",
-            "Tell me about a time you had to coordinate with law enforcement or external agencies.",
-            "Describe a situation where you had to learn about a new threat quickly.",
-            "How do you approach building security awareness across an organization?",
-            "Tell me about a time when you had to present security metrics to leadership.",
-            "Describe a situation where you had to work with a third-party security vendor.",
-            "How do you handle the stress of constant vigilance required in security?",
-            "Tell me about a time when you had to update security policies or procedures.",
-            "Describe a situation where you had to investigate a potential insider threat.",
-            "How do you approach collaboration with other IT teams on security matters?",
-            "Tell me about a time when you had to make a quick security decision."
-        ],
-        "Role-specific": [
-            "What security tools and technologies are you experienced with?",
-            "How would you implement a security awareness program?",
-            "Describe your experience with compliance requirements (GDPR, HIPAA, etc.)",
-            "What's your approach to security logging and monitoring?",
-            "How would you conduct a security audit?",
-            "Describe your experience with digital forensics and incident investigation.",
-            "How do you approach security architecture and design reviews?",
-            "What's your experience with business continuity and disaster recovery planning?",
-            "How do you handle security vendor evaluation and management?",
-            "Describe your approach to security metrics and reporting.",
-            "How would you develop and test an incident response plan?",
-            "What's your experience with security policy development and governance?",
-            "How do you approach threat hunting and proactive security measures?",
-            "Describe your experience with security training and certification programs.",
-            "How would you secure cloud infrastructure and services?",
-            "What's your approach to managing security across multiple locations?",
-            "How do you handle security aspects of mergers and acquisitions?",
-            "Describe your experience with security budget planning and justification.",
-            "How would you approach implementing new security technologies?",
-            "What's your experience with coordinating security across different business units?"
-        ]
-    
-    }
-}
-
-COMMON_QUESTIONS = {
-    "Background": [
-        "Tell me more about yourself and why you're interested in this field.",
-        ]
-}
+# The question bank lives in question_bank.json and hot-reloads when the file changes
+question_bank = get_question_bank()
+JOB_FIELDS = question_bank.job_fields
+COMMON_QUESTIONS = question_bank.common_questions
 
 def generate_questions(job_field, num_questions):
     questions = []
@@ -731,51 +438,126 @@ def generate_questions(job_field, num_questions):
     # No need to shuffle since we want to maintain the category order
     return questions
 
-def transcribe_audio(audio_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-        temp_audio.write(audio_file)
-        temp_audio_path = temp_audio.name
-    
-    model = load_whisper_model()
+# Re-pick the question for a slot from the running evaluations (adaptive mode only)
+def adapt_question_slot(slot_idx):
+    questions = st.session_state.questions
+    if not st.session_state.adaptive_questions or slot_idx >= len(questions):
+        return None
     
+    evaluations = st.session_state.evaluations
+    asked = [q["question"] for i, q in enumerate(questions) if i != slot_idx]
+    next_question = select_next_question(
+        question_bank,
+        st.session_state.selected_job_field,
+        evaluations,
+        asked,
+        category=questions[slot_idx]["category"],
+        skill_assessment=aggregate_skill_assessment(evaluations) if evaluations else None,
+        seed=st.session_state.adaptive_seed + slot_idx
+    )
+    if next_question:
+        questions[slot_idx] = next_question
+    return next_question
+
+def transcribe_audio(audio_file):
+    """
+    Transcribe a recorded answer.
+
+    Returns:
+    - (transcript, delivery metrics dict or None), the metrics computed from
+      Whisper's word timestamps; ("", None) for a recording with no speech,
+      and (None, None) for one that couldn't be decoded
+    """
     if st.session_state.get("faster_transcription", True):
-        segments, info = model.transcribe(
-            temp_audio_path, 
+        options = dict(
             beam_size=1,
             vad_filter=True,
             vad_parameters=dict(min_silence_duration_ms=500),
+            word_timestamps=True,
             language="en"
         )
     else:
-        segments, info = model.transcribe(
-            temp_audio_path, 
+        options = dict(
             beam_size=5,
+            word_timestamps=True,
             language="en"
         )
     
+    # Reruns can hand back the same recording; answer those without touching the model
+    cache = get_transcript_cache()
+    cache_key = transcript_key(audio_file, whisper_model_size(), options)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Trimmed, gain-normalized samples go straight to Whisper; silent recordings never reach it
+    audio, status = preprocess_recording(audio_file)
+    if status == "empty":
+        cache.set(cache_key, "", None)
+        return "", None
+    
+    # The sidecar holds one set of models for every worker on the host
+    segments = None
+    service = get_speech_service()
+    if service.available():
+        try:
+            segments = service.transcribe(audio if status == "ok" else audio_file,
+                                          whisper_model_size(), *whisper_device(), options)
+        except (OSError, SpeechServiceError) as e:
+            print(f"Speech service transcription failed, using local model: {str(e)}")
+    
+    if segments is None:
+        model = load_whisper_model()
+        if status == "ok":
+            # Long answers are split at pauses and transcribed in parallel chunks
+            segments = transcribe_samples(model, audio, **options)
+        else:
+            try:
+                segments, info = model.transcribe(BytesIO(audio_file), **options)
+                segments = list(segments)
+            except Exception as e:
+                # Remembered like a silent recording, so reruns with the upload still in place don't retry it
+                print(f"Error decoding recording: {str(e)}")
+                cache.set(cache_key, None, None)
+                return None, None
+    
+    # Keep the segments for their timing
+    segments = list(segments)
     transcript = ""
     for segment in segments:
         transcript += segment.text + " "
     
-    os.unlink(temp_audio_path)
-    
-    return transcript.strip()
+    transcript = transcript.strip()
+    delivery = compute_delivery_metrics(*segment_words(segments))
+    cache.set(cache_key, transcript, delivery)
+    return transcript, delivery
 
 # Enhanced answer feedback function that uses structured evaluation
-def get_answer_feedback(question, answer):
+def get_answer_feedback(question, answer, category=None, delivery=None):
     """
     Get detailed feedback for an interview answer
     
     Parameters:
     - question: The interview question
     - answer: The candidate's answer
+    - category: The question category, which helps pick the evaluation model
+    - delivery: Delivery metrics measured from the recording, if the answer was spoken
     
     Returns:
     - String containing formatted feedback
     """
     # Get structured evaluation data
     job_field = st.session_state.selected_job_field or "General"
-    eval_data = get_answer_evaluation(question, answer, job_field)
+    
+    # Instant local estimate, replaced by the full evaluation when it arrives
+    provisional = provisional_scores(question, answer)
+    provisional_placeholder = st.empty()
+    provisional_placeholder.info(
+        f"Provisional scores: Content {provisional['content']}/10, "
+        f"Clarity {provisional['clarity']}/10. Detailed feedback is on its way..."
+    )
+    eval_data = get_answer_evaluation(question, answer, job_field, category, provisional, delivery)
+    provisional_placeholder.empty()
     
     # Store the evaluation data for later use with the dashboard
     if 'evaluations' not in st.session_state:
@@ -810,6 +592,12 @@ def get_answer_feedback(question, answer):
     {eval_data['improved_answer']}
     """
     
+    if eval_data.get("delivery_metrics"):
+        feedback += f"""
+    ### Delivery:
+    {chr(10).join(['- ' + line for line in describe_delivery(eval_data['delivery_metrics'])])}
+    """
+    
     return feedback
 
 # Function to convert image to base64 for embedding in HTML
@@ -828,11 +616,14 @@ if st.session_state.questions and st.session_state.setup_stage == "interview":
         
         if st.button("End Interview & See Results"):
             st.session_state.interview_complete = True
+            checkpoint_session()
             st.rerun()
         
         if st.button("Restart Interview"):
+            st.session_state.tts_prefetch.cancel_all()
+            get_checkpoint_store().delete(st.session_state.session_id)
             for key in ['questions', 'current_question_idx', 'answers', 'feedbacks', 
-                       'recording', 'audio_data', 'transcription', 'interview_complete', 
+                       'recording', 'audio_data', 'transcription', 'delivery_metrics', 'interview_complete', 
                        'show_feedback', 'question_spoken', 'evaluations']:
                 if key in st.session_state:
                     if isinstance(st.session_state[key], list):
@@ -1516,6 +1307,11 @@ elif st.session_state.setup_stage == "interview_settings" and not st.session_sta
                 index=0
             )
             st.session_state.voice_type = voice_options[selected_voice]
+        
+        st.session_state.adaptive_questions = st.checkbox(
+            "Adapt questions to my performance",
+            value=st.session_state.adaptive_questions
+        )
     
     st.markdown('<div style="height: 30px;"></div>', unsafe_allow_html=True)
     
@@ -1533,6 +1329,8 @@ elif st.session_state.setup_stage == "interview_settings" and not st.session_sta
                 st.session_state.selected_job_field,
                 num_questions
             )
+            st.session_state.adaptive_seed = int(np.random.randint(0, 2**31 - 1))
+            st.session_state.interview_id = uuid.uuid4().hex
             st.session_state.current_question_idx = 0
             st.session_state.answers = [""] * len(st.session_state.questions)
             st.session_state.feedbacks = [""] * len(st.session_state.questions)
@@ -1542,6 +1340,7 @@ elif st.session_state.setup_stage == "interview_settings" and not st.session_sta
             st.session_state.question_spoken = False
             st.session_state.interview_stage = "introduction"
             st.session_state.setup_stage = "interview"
+            checkpoint_session()
             st.rerun()
 
 # Interview results screen
@@ -1551,13 +1350,17 @@ elif st.session_state.interview_complete:
     
     if st.session_state.answers and not all(answer == "" for answer in st.session_state.answers):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        session_data = {
-            "timestamp": timestamp,
-            "questions": st.session_state.questions,
-            "answers": st.session_state.answers,
-            "feedbacks": st.session_state.feedbacks
-        }
-        st.session_state.session_history.append(session_data)
+        history_entry = build_history_entry(
+            question_bank,
+            st.session_state.interview_id,
+            timestamp,
+            st.session_state.selected_job_field,
+            st.session_state.questions,
+            st.session_state.answers,
+            st.session_state.evaluations
+        )
+        # Recorded once per interview, even though this screen reruns
+        record_history(st.session_state.session_history, history_entry, st.session_state.session_id)
     
     # Create a file for the dashboard if we have evaluations
     dashboard_url = None
@@ -1652,15 +1455,17 @@ elif st.session_state.interview_complete:
             else:
                 if answer:
                     with st.spinner("Generating feedback..."):
-                        feedback = get_answer_feedback(question_data['question'], answer)
+                        feedback = get_answer_feedback(question_data['question'], answer, question_data['category'])
                         st.session_state.feedbacks[i] = feedback
                         st.write(feedback)
                 else:
                     st.write("*No feedback available (no answer provided)*")
     
     if st.button("Practice Again", type="primary"):
+        st.session_state.tts_prefetch.cancel_all()
+        get_checkpoint_store().delete(st.session_state.session_id)
         for key in ['questions', 'current_question_idx', 'answers', 'feedbacks', 
-                   'recording', 'audio_data', 'transcription', 'interview_complete',
+                   'recording', 'audio_data', 'transcription', 'delivery_metrics', 'interview_complete',
                    'question_spoken', 'evaluations']:
             if key in st.session_state:
                 if isinstance(st.session_state[key], list):
@@ -1676,14 +1481,14 @@ elif st.session_state.interview_complete:
     if st.session_state.session_history and st.button("View Practice History"):
         st.subheader("Your Practice History")
         for i, session in enumerate(reversed(st.session_state.session_history)):
-            with st.expander(f"Session {len(st.session_state.session_history) - i}: {session['timestamp']}"):
-                for j, (q_data, ans, feed) in enumerate(zip(session['questions'], session['answers'], session['feedbacks'])):
+            with st.expander(f"Session {len(st.session_state.session_history) - i}: {session.timestamp}"):
+                session_questions = session.resolve_questions()
+                for j, (q_data, ans, score) in enumerate(zip(session_questions, session.answers, session.overall_scores)):
                     st.write(f"**Q{j+1}: {q_data['question']}** ({q_data['category']})")
                     st.write("*Your answer:*")
                     st.write(ans if ans else "*No answer recorded*")
-                    if feed:
-                        st.write("*Feedback:*")
-                        st.write(feed)
+                    if score is not None:
+                        st.write(f"*Overall score:* {score}/10")
                     st.divider()
 
 
@@ -1701,21 +1506,24 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
         interviewee_name = st.session_state.interviewer_name or "candidate"
         job_role = st.session_state.selected_job_field
         
-        intro_text = f"Hi {interviewee_name}, welcome to your interview practice for a {job_role} role. I'll be asking you a series of questions."
+        introduction = intro_text(interviewee_name, job_role)
         
         # Generate audio for the introduction
         if st.session_state.use_voice:
-            audio_fp = text_to_speech(intro_text)
+            # The questions synthesize while the introduction plays
+            prefetch_interview_questions()
+            audio_fp = intro_to_speech(interviewee_name, job_role)
             autoplay_audio(audio_fp)
         
         # Display the introduction text with minimal styling
-        st.info(intro_text)
+        st.info(introduction)
         
         # Show a "Continue" button to proceed to the first question
         if st.button("Continue to First Question", type="primary"):
             st.session_state.current_question_idx = 0
             st.session_state.interview_stage = "question"
             st.session_state.question_spoken = False
+            checkpoint_session()
             st.rerun()
             
     except Exception as e:
@@ -1781,7 +1589,6 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
 
             if audio_fp:
                 autoplay_audio(audio_fp)
-                time.sleep(1)
                 st.session_state.question_spoken = True
             else:
                 st.error("TTS audio was not generated correctly.")
@@ -1790,6 +1597,13 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
             st.error(f"Error playing question audio: {str(e)}")
             st.session_state.question_spoken = True
 
+    # Synthesize the upcoming questions while this one is being answered.
+    # In adaptive mode the next slot is first predicted from the scores so far.
+    if st.session_state.use_voice:
+        if st.session_state.adaptive_questions:
+            adapt_question_slot(st.session_state.current_question_idx + 1)
+        prefetch_upcoming_questions(st.session_state.current_question_idx)
+
     # Response input area with minimal styling
     if st.session_state.transcription:
         # Display transcribed answer with dark theme styling
@@ -1809,17 +1623,22 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
         if st.button("Save Answer & Continue", type="primary"):
             st.session_state.answers[st.session_state.current_question_idx] = edited_answer
             with st.spinner("Generating feedback..."):
-                feedback = get_answer_feedback(current_question, edited_answer)
+                feedback = get_answer_feedback(current_question, edited_answer, current_category,
+                                               st.session_state.delivery_metrics)
                 st.session_state.feedbacks[st.session_state.current_question_idx] = feedback
 
+            # Now that this answer is scored, settle the next question
+            adapt_question_slot(st.session_state.current_question_idx + 1)
             st.session_state.current_question_idx += 1
             st.session_state.transcription = ""
+            st.session_state.delivery_metrics = None
             st.session_state.audio_data = None
             st.session_state.question_spoken = False
 
             if st.session_state.current_question_idx >= len(st.session_state.questions):
                 st.session_state.interview_complete = True
 
+            checkpoint_session()
             st.rerun()
 
     else:
@@ -1897,24 +1716,41 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
         with col2:
             # Using the actual audio_recorder component directly
             audio_bytes = audio_recorder(pause_threshold=2.0, sample_rate=16000, key="audio_recorder")
-            
-            if audio_bytes:
-                st.session_state.audio_data = audio_bytes
-                st.markdown("""
-                <p style="margin-top: 8px; font-size: 13px; color: #cccccc; text-align: center;">
-                    Processing audio...
-                </p>
-                """, unsafe_allow_html=True)
-
-                with st.spinner("Transcribing..."):
-                    transcript = transcribe_audio(audio_bytes)
-                    st.session_state.transcription = transcript
-                    st.rerun()
+        
+        # Compressed recordings (Opus/OGG/WebM) are a fraction of the recorder's WAV size
+        uploaded_answer = st.file_uploader(
+            "Or upload a recorded answer",
+            type=COMPRESSED_AUDIO_TYPES + ["wav"],
+            key=f"answer_upload_{st.session_state.current_question_idx}"
+        )
+        if uploaded_answer is not None and not audio_bytes:
+            audio_bytes = uploaded_answer.getvalue()
+        
+        if audio_bytes:
+            st.markdown("""
+            <p style="margin-top: 8px; font-size: 13px; color: #cccccc; text-align: center;">
+                Processing audio...
+            </p>
+            """, unsafe_allow_html=True)
+
+            with st.spinner("Transcribing..."):
+                transcript, delivery = transcribe_audio(audio_bytes)
+            # The recording isn't kept once it has been transcribed, compressed or not
+            st.session_state.audio_data = None
+            if transcript:
+                st.session_state.transcription = transcript
+                st.session_state.delivery_metrics = delivery
+                st.rerun()
+            elif transcript is None:
+                st.error("That recording couldn't be read. Please upload an OGG, Opus, WebM, M4A, MP3 or WAV file, or record your answer instead.")
+            else:
+                st.warning("No speech was detected in that recording. Please try again, speaking a little closer to the microphone.")
         
         # Submit button
         if st.button("Submit Answer", type="primary"):
             if text_answer.strip():
                 st.session_state.transcription = text_answer
+                st.session_state.delivery_metrics = None
                 st.rerun()
             else:
                 st.error("Please provide an answer before submitting.")
@@ -1927,7 +1763,8 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
         
         with st.spinner("Generating feedback..."):
             if not st.session_state.feedbacks[st.session_state.current_question_idx]:
-                feedback = get_answer_feedback(current_question, st.session_state.transcription)
+                feedback = get_answer_feedback(current_question, st.session_state.transcription, current_category,
+                                               st.session_state.delivery_metrics)
                 st.session_state.feedbacks[st.session_state.current_question_idx] = feedback
             else:
                 feedback = st.session_state.feedbacks[st.session_state.current_question_idx]
@@ -1940,9 +1777,11 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
             
             if st.button("Continue to Next Question", type="primary"):
                 st.session_state.answers[st.session_state.current_question_idx] = st.session_state.transcription
+                adapt_question_slot(st.session_state.current_question_idx + 1)
                 
                 st.session_state.current_question_idx += 1
                 st.session_state.transcription = ""
+                st.session_state.delivery_metrics = None
                 st.session_state.audio_data = None
                 st.session_state.show_feedback = False
                 st.session_state.question_spoken = False
@@ -1950,6 +1789,7 @@ elif st.session_state.setup_stage == "interview" and st.session_state.interview_
                 if st.session_state.current_question_idx >= len(st.session_state.questions):
                     st.session_state.interview_complete = True
                 
+                checkpoint_session()
                 st.rerun()
 
 # If we got to this point without displaying a page, something went wrong
@@ -1958,6 +1798,10 @@ else:
     
     # Keep the reset button as requested
     if st.button("Reset Application"):
+        if "tts_prefetch" in st.session_state:
+            st.session_state.tts_prefetch.cancel_all()
+        if "session_id" in st.session_state:
+            get_checkpoint_store().delete(st.session_state.session_id)
         for key in st.session_state.keys():
             del st.session_state[key]
         st.session_state.setup_stage = "welcome_page"
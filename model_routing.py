@@ -0,0 +1,94 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Model and token budget per tier; "local" never calls the API
+MODEL_TIERS = {
+    "local": {"model": None, "max_tokens": 0},
+    "small": {"model": "gpt-3.5-turbo", "max_tokens": 700},
+    "strong": {"model": "gpt-4-turbo", "max_tokens": 1000},
+}
+
+# Answers up to this many words are scored locally; there is nothing to judge
+LOCAL_MAX_WORDS = 8
+
+# Answers up to this many words go to the small model unless the category needs the strong one
+SMALL_MAX_WORDS = 40
+
+# Categories where technical correctness matters enough to need the strong model
+STRONG_CATEGORIES = {"Technical", "Role-specific"}
+
+# Strong-model evaluations in flight in this worker before new ones are downgraded
+MAX_STRONG_IN_FLIGHT = 4
+
+# Log the per-tier latency summary after this many evaluations
+LATENCY_LOG_EVERY = 20
+
+_lock = threading.Lock()
+_in_flight = {tier: 0 for tier in MODEL_TIERS}
+
+# tier -> [evaluations, total seconds, slowest seconds] for this worker
+TIER_LATENCY = {tier: [0, 0.0, 0.0] for tier in MODEL_TIERS}
+
+
+class Route:
+    """Which tier evaluates an answer, and why"""
+
+    __slots__ = ("tier", "model", "max_tokens", "reason")
+
+    def __init__(self, tier, reason):
+        self.tier = tier
+        self.model = MODEL_TIERS[tier]["model"]
+        self.max_tokens = MODEL_TIERS[tier]["max_tokens"]
+        self.reason = reason
+
+
+def choose_route(answer, category=None):
+    """
+    Pick the evaluation tier for an answer from its length, question category
+    and how busy the strong model is in this worker.
+
+    Parameters:
+    - answer: The candidate's answer
+    - category: The question category (e.g. "Technical"), if known
+
+    Returns:
+    - A Route
+    """
+    word_count = len(answer.split()) if answer else 0
+    if word_count <= LOCAL_MAX_WORDS:
+        return Route("local", f"{word_count} words")
+    if word_count <= SMALL_MAX_WORDS and category not in STRONG_CATEGORIES:
+        return Route("small", f"{word_count} words, {category or 'uncategorized'}")
+    with _lock:
+        busy = _in_flight["strong"] >= MAX_STRONG_IN_FLIGHT
+    if busy:
+        return Route("small", f"strong model busy ({MAX_STRONG_IN_FLIGHT} in flight)")
+    return Route("strong", f"{word_count} words, {category or 'uncategorized'}")
+
+
+@contextmanager
+def track_route(route):
+    """Count a routed evaluation as in flight and log its tier, reason and latency"""
+    with _lock:
+        _in_flight[route.tier] += 1
+    started = time.perf_counter()
+    try:
+        yield route
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _in_flight[route.tier] -= 1
+            stats = TIER_LATENCY[route.tier]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            total = sum(s[0] for s in TIER_LATENCY.values())
+        print(f"evaluation_route tier={route.tier} model={route.model} "
+              f"reason={route.reason} latency_ms={elapsed * 1000:.0f}")
+        if total % LATENCY_LOG_EVERY == 0:
+            print("evaluation_latency " + " ".join(
+                f"{tier}=n:{n},avg_ms:{(seconds / n) * 1000:.0f},max_ms:{slowest * 1000:.0f}"
+                for tier, (n, seconds, slowest) in TIER_LATENCY.items() if n
+            ))
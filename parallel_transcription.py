@@ -0,0 +1,193 @@
+import math
+import os
+from collections import namedtuple
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from audio_preprocessing import WHISPER_SAMPLE_RATE, FRAME_SECONDS, frame_levels_db, voiced_frames
+
+# Whisper model workers; each can run one transcribe call at a time in parallel
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Recordings shorter than this are transcribed in one call (seconds)
+PARALLEL_MIN_SECONDS = 40
+
+# Chunks are never shorter than this, so each keeps enough context (seconds)
+MIN_CHUNK_SECONDS = 15
+
+# How far from an evenly spaced boundary to look for a silence to cut at (seconds)
+CUT_SEARCH_SECONDS = 5.0
+
+# Overlap either side of a cut that had to land in speech (seconds)
+CUT_OVERLAP_SECONDS = 1.0
+
+# Sample ranges of a chunk; words are kept only if their midpoint falls in [keep_start, keep_end)
+Chunk = namedtuple("Chunk", ["start", "end", "keep_start", "keep_end"])
+
+# Stitched results, shaped like faster-whisper's so delivery_metrics can read them
+Segment = namedtuple("Segment", ["start", "end", "text", "words"])
+Word = namedtuple("Word", ["start", "end", "word", "probability"])
+
+
+def model_threads():
+    """
+    cpu_threads for a Whisper model loaded with num_workers=TRANSCRIBE_WORKERS.
+
+    Each worker gets an even share of the cores, since up to TRANSCRIBE_WORKERS
+    calls (chunks of one recording, or answers from different sessions) run at once.
+    """
+    return max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS)
+
+
+def _longest_run(mask):
+    """(start, end) frame indices of the longest run of True in mask, or None"""
+    if not mask.any():
+        return None
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    longest = np.argmax(ends - starts)
+    return starts[longest], ends[longest]
+
+
+def split_at_silences(samples, chunk_count, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Split a recording into about chunk_count chunks, cutting in pauses.
+
+    Each cut goes in the middle of the longest silence near its evenly spaced
+    position. Where the speaker never paused, the cut goes at the quietest
+    frame and neighbouring chunks overlap by CUT_OVERLAP_SECONDS, so no word
+    is lost; stitch_segments drops the duplicates.
+
+    Returns:
+    - List of Chunk in order, covering the whole recording
+    """
+    if chunk_count <= 1:
+        return [Chunk(0, len(samples), 0, len(samples))]
+    levels = frame_levels_db(samples, sample_rate)
+    silent = ~voiced_frames(levels)
+    frame = int(sample_rate * FRAME_SECONDS)
+    search = int(CUT_SEARCH_SECONDS / FRAME_SECONDS)
+    overlap = int(CUT_OVERLAP_SECONDS * sample_rate)
+
+    cuts = []
+    for i in range(1, chunk_count):
+        target = int(len(levels) * i / chunk_count)
+        low, high = max(0, target - search), min(len(levels), target + search)
+        if high <= low:
+            continue
+        run = _longest_run(silent[low:high])
+        if run is not None:
+            cuts.append(((low + (run[0] + run[1]) // 2) * frame, 0))
+        else:
+            cuts.append(((low + int(np.argmin(levels[low:high]))) * frame, overlap))
+
+    chunks = []
+    start, keep_start = 0, 0
+    for cut, pad in cuts:
+        if cut <= keep_start:
+            continue
+        chunks.append(Chunk(start, min(len(samples), cut + pad), keep_start, cut))
+        start, keep_start = max(0, cut - pad), cut
+    chunks.append(Chunk(start, len(samples), keep_start, len(samples)))
+    return chunks
+
+
+def stitch_segments(chunks, chunk_segments, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Merge per-chunk segments into one timeline.
+
+    Timestamps are shifted by each chunk's offset, and words (or whole segments,
+    without word timestamps) from overlapping edges are kept only by the chunk
+    that owns their midpoint.
+    """
+    stitched = []
+    for chunk, segments in zip(chunks, chunk_segments):
+        offset = chunk.start / sample_rate
+        keep_start, keep_end = chunk.keep_start / sample_rate, chunk.keep_end / sample_rate
+
+        def owned(start, end):
+            return keep_start <= offset + (start + end) / 2 < keep_end
+
+        for segment in segments:
+            words = getattr(segment, "words", None)
+            if words:
+                kept = [Word(w.start + offset, w.end + offset, w.word, w.probability)
+                        for w in words if owned(w.start, w.end)]
+                if kept:
+                    stitched.append(Segment(kept[0].start, kept[-1].end, "".join(w.word for w in kept), kept))
+            elif owned(segment.start, segment.end):
+                stitched.append(Segment(segment.start + offset, segment.end + offset, segment.text, None))
+    stitched.sort(key=lambda s: s.start)
+    return stitched
+
+
+def transcribe_samples(model, samples, workers=TRANSCRIBE_WORKERS, chunk_count=None, slots=None, **options):
+    """
+    Transcribe 16 kHz samples, splitting long recordings across model workers.
+
+    Parameters:
+    - model: WhisperModel loaded with num_workers >= workers (see model_threads)
+    - samples: float32 mono samples at 16 kHz
+    - workers: How many chunks to transcribe at once
+    - chunk_count: Force a number of chunks (for benchmarking); by default one
+      per worker, but never shorter than MIN_CHUNK_SECONDS
+    - slots: Semaphore shared with other callers, held for each chunk's
+      decode, so concurrent requests never run more than its count at once
+    - options: Passed through to model.transcribe
+
+    Returns:
+    - List of segments in order
+    """
+    duration = len(samples) / WHISPER_SAMPLE_RATE
+    if chunk_count is None:
+        if duration < PARALLEL_MIN_SECONDS or workers < 2:
+            chunk_count = 1
+        else:
+            chunk_count = min(workers, math.floor(duration / MIN_CHUNK_SECONDS))
+    chunks = split_at_silences(samples, chunk_count)
+
+    def transcribe(chunk):
+        # transcribe() is lazy; iterating here makes the decoding happen on this thread
+        with slots or nullcontext():
+            segments, _ = model.transcribe(samples[chunk.start:chunk.end], **options)
+            return list(segments)
+
+    if len(chunks) == 1:
+        return transcribe(chunks[0])
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        results = list(pool.map(transcribe, chunks))
+    return stitch_segments(chunks, results)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from faster_whisper import WhisperModel
+    from audio_preprocessing import preprocess_recording
+
+    if len(sys.argv) < 2:
+        print("Usage: python parallel_transcription.py <recording.wav> [model size]")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        samples, status = preprocess_recording(f.read())
+    if status != "ok":
+        print(f"Can't benchmark this recording: {status}")
+        sys.exit(1)
+
+    cores = os.cpu_count() or 1
+    counts = [n for n in (1, 2, 4, 8, 16) if n <= cores]
+    model_size = sys.argv[2] if len(sys.argv) > 2 else "small"
+    print(f"Recording: {len(samples) / WHISPER_SAMPLE_RATE:.1f}s, cores: {cores}, model: {model_size}")
+
+    baseline = None
+    for n in counts:
+        model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                             cpu_threads=max(1, cores // n), num_workers=n)
+        start = time.perf_counter()
+        segments = transcribe_samples(model, samples, workers=n, chunk_count=n,
+                                      beam_size=1, word_timestamps=True, language="en")
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        words = sum(len(s.words or []) for s in segments)
+        print(f"chunks={n:2d}  {elapsed:6.2f}s  speedup {baseline / elapsed:4.2f}x  words={words}")
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Editable source of the question bank (JSON, checked into the repo)
+QUESTION_BANK_SOURCE = Path(os.environ.get(
+    "QUESTION_BANK_SOURCE", Path(__file__).with_name("question_bank.json")
+))
+
+# Compiled SQLite index, built once per host; each worker process copies it into memory
+QUESTION_BANK_DB = Path(os.environ.get(
+    "QUESTION_BANK_DB", Path(tempfile.gettempdir()) / "intervuai_question_bank.db"
+))
+
+# Minimum number of seconds between checks of the source file for edits
+RELOAD_CHECK_INTERVAL = 2.0
+
+_bank = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+class QuestionBank:
+    """Read-only, in-process view of one compiled version of the question bank"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.job_fields = {}
+        self.common_questions = {}
+        self.by_id = {}
+        self._ids = {}
+
+        grouped = {}
+        for question_id, job_field, category, text in rows:
+            grouped.setdefault((job_field, category), []).append(text)
+            self.by_id[question_id] = (job_field, category, text)
+            self._ids[(job_field, text)] = question_id
+
+        # Tuples keep each version immutable while requests are using it
+        for (job_field, category), texts in grouped.items():
+            if job_field is None:
+                self.common_questions[category] = tuple(texts)
+            else:
+                self.job_fields.setdefault(job_field, {})[category] = tuple(texts)
+
+    def question_id(self, job_field, text):
+        """Return the stable ID of a question, or None if it is not in the bank"""
+        question_id = self._ids.get((job_field, text))
+        if question_id is None:
+            question_id = self._ids.get((None, text))
+        return question_id
+
+    def get(self, question_id):
+        """Return (job_field, category, text) for a question ID, or None"""
+        return self.by_id.get(question_id)
+
+
+def _stable_question_id(job_field, category, text):
+    """Derive an ID that survives recompiles as long as the question is unchanged"""
+    key = f"{job_field or ''}\x1f{category}\x1f{text}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=6).digest(), "big")
+
+
+def _source_version(source_path):
+    """Version string for the source file, based on its mtime and size"""
+    stat = os.stat(source_path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _read_db_version(db_path):
+    """Return the source version a compiled database was built from, or None"""
+    if not Path(db_path).exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def compile_question_bank(source_path=QUESTION_BANK_SOURCE, db_path=QUESTION_BANK_DB):
+    """
+    Compile the JSON question bank into a SQLite index.
+
+    The database is written to a temporary file and swapped in with an atomic
+    rename, so workers reading the previous version are never disturbed.
+
+    Parameters:
+    - source_path: Path to the JSON question bank
+    - db_path: Path of the compiled database to (re)create
+
+    Returns:
+    - The source version that was compiled
+    """
+    version = _source_version(source_path)
+    with open(source_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    entries = []
+    for category, texts in data.get("common_questions", {}).items():
+        entries.extend((None, category, text) for text in texts)
+    for job_field, categories in data.get("job_fields", {}).items():
+        for category, texts in categories.items():
+            entries.extend((job_field, category, text) for text in texts)
+    rows = [
+        (_stable_question_id(job_field, category, text), position, job_field, category, text)
+        for position, (job_field, category, text) in enumerate(entries)
+    ]
+
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(f"{db_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("""
+            CREATE TABLE questions (
+                id INTEGER PRIMARY KEY,
+                position INTEGER NOT NULL,
+                job_field TEXT,
+                category TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        # INSERT OR IGNORE drops exact duplicates within a category
+        conn.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO meta VALUES ('source_version', ?)", (version,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return version
+
+
+def _load_bank(db_path):
+    """Load a compiled question bank database into a QuestionBank"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()[0]
+        # Keep the order of the source file so category ordering is unchanged
+        rows = conn.execute("SELECT id, job_field, category, text FROM questions ORDER BY position").fetchall()
+    finally:
+        conn.close()
+    return QuestionBank(version, rows)
+
+
+def get_question_bank():
+    """
+    Return the current question bank, reloading it if the source file changed.
+
+    The source is checked at most once every RELOAD_CHECK_INTERVAL seconds, so
+    lookups on the hot path are a plain attribute access. The first worker on a
+    host that sees a new version compiles it; the others just load the result.
+    If an edit leaves the source unreadable, the last good version keeps serving.
+    """
+    global _bank, _last_check
+
+    if _bank is not None and time.monotonic() - _last_check < RELOAD_CHECK_INTERVAL:
+        return _bank
+
+    with _lock:
+        if _bank is not None and time.monotonic() - _last_check < RELOAD_CHECK_INTERVAL:
+            return _bank
+        _last_check = time.monotonic()
+        try:
+            version = _source_version(QUESTION_BANK_SOURCE)
+            if _bank is not None and _bank.version == version:
+                return _bank
+            if _read_db_version(QUESTION_BANK_DB) != version:
+                compile_question_bank(QUESTION_BANK_SOURCE, QUESTION_BANK_DB)
+            _bank = _load_bank(QUESTION_BANK_DB)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Error reloading question bank: {str(e)}")
+            if _bank is None:
+                raise
+    return _bank
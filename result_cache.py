@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+# Directory holding the persistent caches; share it between workers on a host.
+# Created 0700 with 0600 files, since cached analyses include contact details.
+RESULT_CACHE_DIR = Path(os.environ.get(
+    "RESULT_CACHE_DIR", Path(tempfile.gettempdir()) / "intervuai_cache"
+))
+
+
+def private_directory(path):
+    """
+    Create a directory only this user can read, tightening an existing one.
+
+    The caches hold resume details (names, emails, phone numbers), so a
+    directory under the shared temp dir that belongs to someone else is
+    refused rather than used.
+    """
+    path = Path(path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid") and path.stat().st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    os.chmod(path, 0o700)
+    return path
+
+
+def private_file(path):
+    """Create a file (if missing) with mode 0600; SQLite gives its -wal/-shm files the same mode"""
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY, 0o600)
+    os.close(fd)
+    os.chmod(path, 0o600)
+    return path
+
+
+def content_hash(*parts):
+    """SHA-256 hex digest of the given str/bytes parts, usable as a cache key"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(part)
+        # Separator so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class PersistentCache:
+    """
+    JSON-serializable results in a SQLite file, evicted least-recently-used.
+
+    Several worker processes can share one cache file. Entries older than
+    max_age seconds are treated as missing, and once the cache holds more
+    than max_entries rows the least recently read ones are deleted.
+    """
+
+    def __init__(self, name, max_entries=1000, max_age=30 * 24 * 3600, directory=RESULT_CACHE_DIR):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.path = private_file(private_directory(directory) / f"{name}.db")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def _connect(self):
+        # A connection per call keeps the cache usable from any thread
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or expired"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE key = ? AND created_at >= ?",
+                    (key, now - self.max_age)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Cache read failed for {self.path.name}: {str(e)}")
+            return None
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries if over capacity"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM entries WHERE key IN "
+                        "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Cache write failed for {self.path.name}: {str(e)}")
@@ -0,0 +1,372 @@
+import re
+from datetime import datetime
+
+# Resume section headings, mapped to the chunk they belong to
+SECTION_HEADINGS = {
+    "experience": [
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history",
+    ],
+    "skills": [
+        "skills", "technical skills", "core competencies", "competencies",
+        "technologies", "tools", "certifications", "languages",
+    ],
+    "education": [
+        "education", "academic background", "qualifications", "projects",
+        "publications", "awards",
+    ],
+    "summary": [
+        "summary", "profile", "professional summary", "objective", "about me",
+    ],
+}
+
+_HEADING_TO_SECTION = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# A heading is a short line that is one of the known names, optionally ending in ':'
+_HEADING_RE = re.compile(
+    r"^\s*(?:[#*\-•]+\s*)?(" + "|".join(
+        re.escape(h) for h in sorted(_HEADING_TO_SECTION, key=len, reverse=True)
+    ) + r")\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def split_resume_sections(text):
+    """
+    Split resume text into sections using a fast heading detector.
+
+    Text before the first recognised heading (name, contact details, summary)
+    goes into "header". Repeated headings of the same kind are concatenated.
+
+    Returns:
+    - Dictionary of section name to text, in the order sections first appear
+    """
+    sections = {}
+    position = 0
+    current = "header"
+    for match in _HEADING_RE.finditer(text):
+        body = text[position:match.start()].strip()
+        if body:
+            sections[current] = (sections.get(current, "") + "\n" + body).strip()
+        current = _HEADING_TO_SECTION[match.group(1).lower()]
+        position = match.end()
+    body = text[position:].strip()
+    if body:
+        sections[current] = (sections.get(current, "") + "\n" + body).strip()
+    return sections
+
+
+def split_long_text(text, max_chars):
+    """Split text into pieces of at most max_chars, breaking on blank lines or newlines"""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind("\n\n", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+# Canonical skill names with the spellings that should map to them
+SKILL_DICTIONARY = {
+    "Python": ["python", "python3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript"],
+    "C": ["c"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "Go": ["golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Swift": ["swift"],
+    "Kotlin": ["kotlin"],
+    "Scala": ["scala"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql"],
+    "NoSQL": ["nosql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node", "node.js", "nodejs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring", "spring boot"],
+    ".NET": [".net", "asp.net", "dotnet"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful apis"],
+    "Microservices": ["microservices", "microservice"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery"],
+    "Git": ["git", "github", "gitlab"],
+    "Linux": ["linux", "unix"],
+    "Bash": ["bash", "shell scripting"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    "Airflow": ["airflow", "apache airflow"],
+    "Snowflake": ["snowflake"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Statistics": ["statistics", "statistical analysis"],
+    "A/B Testing": ["a/b testing", "ab testing", "experimentation"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Visualization": ["data visualization", "data visualisation"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["excel", "microsoft excel"],
+    "ETL": ["etl"],
+    "Figma": ["figma"],
+    "Sketch": ["sketch"],
+    "Adobe XD": ["adobe xd"],
+    "Photoshop": ["photoshop"],
+    "Illustrator": ["illustrator"],
+    "User Research": ["user research", "ux research"],
+    "Wireframing": ["wireframing", "wireframes"],
+    "Prototyping": ["prototyping", "prototypes"],
+    "Usability Testing": ["usability testing"],
+    "Accessibility": ["accessibility", "wcag"],
+    "Agile": ["agile"],
+    "Scrum": ["scrum"],
+    "Kanban": ["kanban"],
+    "Jira": ["jira"],
+    "Confluence": ["confluence"],
+    "Project Management": ["project management"],
+    "Stakeholder Management": ["stakeholder management"],
+    "Risk Management": ["risk management"],
+    "Budgeting": ["budgeting", "budget management"],
+    "PMP": ["pmp"],
+    "PRINCE2": ["prince2"],
+    "ITIL": ["itil"],
+    "Active Directory": ["active directory"],
+    "Windows Server": ["windows server"],
+    "Networking": ["networking", "tcp/ip", "dns", "dhcp"],
+    "Troubleshooting": ["troubleshooting"],
+    "Help Desk": ["help desk", "helpdesk", "service desk"],
+    "ServiceNow": ["servicenow"],
+    "Office 365": ["office 365", "microsoft 365", "o365"],
+    "Cybersecurity": ["cybersecurity", "cyber security", "information security", "infosec"],
+    "Penetration Testing": ["penetration testing", "pentesting", "pen testing"],
+    "SIEM": ["siem", "splunk", "qradar"],
+    "Incident Response": ["incident response"],
+    "Vulnerability Management": ["vulnerability management", "vulnerability assessment"],
+    "Firewalls": ["firewalls", "firewall"],
+    "IAM": ["iam", "identity and access management"],
+    "ISO 27001": ["iso 27001", "iso27001"],
+    "NIST": ["nist"],
+    "CISSP": ["cissp"],
+    "Communication": ["communication", "communication skills"],
+    "Leadership": ["leadership", "team leadership"],
+    "Mentoring": ["mentoring", "coaching"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+}
+
+# Aliases that are also ordinary words ("excel at", "Spring 2019", "swift delivery");
+# they only count inside a skills section, where a bare word is a skill name
+AMBIGUOUS_SKILL_ALIASES = {
+    "c", "excel", "swift", "spring", "node", "sketch", "rust", "ruby", "java", "react",
+    "angular", "flask", "spark", "airflow", "snowflake", "kafka", "jenkins", "mongo",
+    "ml", "illustrator", "agile", "vue", "git", "scala", "networking", "coaching",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9.+#/-]*[a-z0-9+#]")
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w-])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?![\w-])")
+EXPLICIT_YEARS_RE = re.compile(
+    r"(\d{1,2}(?:\.\d)?)\+?\s*(?:years|yrs)\.?(?:\s+of)?\s+(?:\w+\s+)?experience",
+    re.IGNORECASE
+)
+DATE_RANGE_RE = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|today)\b",
+    re.IGNORECASE
+)
+
+_END = object()
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SkillMatcher:
+    """Longest-match skill lookup over a token trie built from SKILL_DICTIONARY"""
+
+    def __init__(self, dictionary=SKILL_DICTIONARY, ambiguous=AMBIGUOUS_SKILL_ALIASES):
+        self.root = {}
+        for canonical, aliases in dictionary.items():
+            for alias in aliases:
+                node = self.root
+                for token in _tokens(alias):
+                    node = node.setdefault(token, {})
+                node[_END] = (canonical, alias in ambiguous)
+
+    def find(self, text, allow_ambiguous=True):
+        """
+        Return canonical skills mentioned in text, in order of first mention.
+
+        With allow_ambiguous=False, aliases that are also ordinary words are skipped.
+        """
+        tokens = _tokens(text)
+        found = {}
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            match, match_end = None, i + 1
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _END in node and (allow_ambiguous or not node[_END][1]):
+                    match, match_end = node[_END][0], j
+            if match:
+                found.setdefault(match, None)
+                i = match_end
+            else:
+                i += 1
+        return list(found)
+
+
+_skill_matcher = SkillMatcher()
+
+
+def extract_experience_years(text, current_year=None):
+    """
+    Years of experience stated or implied by a resume.
+
+    An explicit "N years of experience" wins. Otherwise the date ranges in
+    the experience section are merged (so overlapping jobs count once) and
+    summed. Returns None if neither is found.
+    """
+    explicit = [float(m.group(1)) for m in EXPLICIT_YEARS_RE.finditer(text)]
+    if explicit:
+        years = max(explicit)
+        return int(years) if years.is_integer() else years
+
+    current_year = current_year or datetime.now().year
+    sections = split_resume_sections(text)
+    ranges = []
+    for start, end in DATE_RANGE_RE.findall(sections.get("experience", text)):
+        end_year = current_year if not end.isdigit() else int(end)
+        if int(start) <= end_year <= current_year:
+            ranges.append((int(start), end_year))
+    if not ranges:
+        return None
+
+    total = 0
+    merged_start, merged_end = None, None
+    for start, end in sorted(ranges):
+        if merged_end is None or start > merged_end:
+            if merged_end is not None:
+                total += merged_end - merged_start
+            merged_start, merged_end = start, end
+        else:
+            merged_end = max(merged_end, end)
+    total += merged_end - merged_start
+    return total
+
+
+def extract_resume_fields(text):
+    """
+    Extract the deterministic resume fields locally, without an LLM call.
+
+    Returns:
+    - Dictionary with "email", "phone", "experience_years" and "skills";
+      fields that weren't found are left out
+    """
+    fields = {}
+    email = EMAIL_RE.search(text)
+    if email:
+        fields["email"] = email.group()
+    for phone in PHONE_RE.finditer(text):
+        # Needs enough digits to be a phone number rather than a date or ID
+        if 9 <= sum(c.isdigit() for c in phone.group()) <= 15:
+            fields["phone"] = phone.group().strip()
+            break
+    years = extract_experience_years(text)
+    if years is not None:
+        fields["experience_years"] = str(years)
+    # Plain words only count as skills where the resume lists skills
+    skills = _skill_matcher.find(text, allow_ambiguous=False)
+    for skill in _skill_matcher.find(split_resume_sections(text).get("skills", "")):
+        if skill not in skills:
+            skills.append(skill)
+    if skills:
+        fields["skills"] = skills
+    return fields
+
+
+# Throughput benchmark over a synthetic corpus of resumes
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(7)
+    skill_aliases = [alias for aliases in SKILL_DICTIONARY.values() for alias in aliases]
+    filler = ("Led a team to deliver projects on time and improved processes across the "
+              "organisation while working closely with stakeholders").split()
+
+    def sample_resume(i):
+        jobs = []
+        year = 2024
+        for _ in range(random.randint(2, 5)):
+            start = year - random.randint(1, 4)
+            bullets = "\n".join(
+                "- " + " ".join(random.choices(filler, k=12)) + " using " + ", ".join(random.sample(skill_aliases, 3))
+                for _ in range(random.randint(3, 6))
+            )
+            jobs.append(f"Engineer, Company {random.randint(1, 999)}\n{start} - {year}\n{bullets}")
+            year = start
+        return (
+            f"Candidate {i}\ncandidate{i}@example.com\n+1 (555) 123-{1000 + i % 9000}\n"
+            f"SUMMARY\nExperienced professional.\nEXPERIENCE\n" + "\n\n".join(jobs) +
+            "\nSKILLS\n" + ", ".join(random.sample(skill_aliases, 15)) +
+            "\nEDUCATION\nBSc Computer Science"
+        )
+
+    corpus = [sample_resume(i) for i in range(2000)]
+    total_bytes = sum(len(r.encode("utf-8")) for r in corpus)
+
+    start = time.perf_counter()
+    results = [extract_resume_fields(r) for r in corpus]
+    elapsed = time.perf_counter() - start
+
+    print(f"Resumes: {len(corpus)} ({total_bytes / 1e6:.1f} MB)")
+    print(f"Total: {elapsed:.2f}s, {elapsed / len(corpus) * 1000:.2f} ms/resume, "
+          f"{len(corpus) / elapsed:.0f} resumes/s, {total_bytes / 1e6 / elapsed:.1f} MB/s")
+    print(f"Fields found: email {sum('email' in r for r in results)}, "
+          f"phone {sum('phone' in r for r in results)}, "
+          f"experience {sum('experience_years' in r for r in results)}, "
+          f"skills {sum('skills' in r for r in results)}")
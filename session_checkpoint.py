@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from result_cache import content_hash, private_directory, private_file
+
+# Which store to use: "sqlite" (default), "file", or "none" to disable checkpoints
+SESSION_CHECKPOINT_STORE = os.environ.get("SESSION_CHECKPOINT_STORE", "sqlite")
+
+# Database file or directory for the store; must be shared by all workers that can serve a session
+SESSION_CHECKPOINT_PATH = Path(os.environ.get(
+    "SESSION_CHECKPOINT_PATH", Path(tempfile.gettempdir()) / "intervuai_checkpoints"
+))
+
+# Checkpoints older than this are pruned (seconds)
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Session state needed to resume an interview exactly where it was left
+CHECKPOINT_KEYS = [
+    "setup_stage",
+    "interview_stage",
+    "selected_job_field",
+    "interviewer_name",
+    "use_voice",
+    "voice_type",
+    "adaptive_questions",
+    "adaptive_seed",
+    "interview_id",
+    "questions",
+    "current_question_idx",
+    "answers",
+    "feedbacks",
+    "evaluations",
+    "transcription",
+    "delivery_metrics",
+    "interview_complete",
+]
+
+
+def encode_snapshot(state):
+    """Serialize the checkpointed keys of session state into compressed JSON"""
+    snapshot = {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "state": {}}
+    for key in CHECKPOINT_KEYS:
+        if key in state:
+            snapshot["state"][key] = state[key]
+    # Question bank strings may come back as numpy strings from np.random.choice
+    payload = json.dumps(snapshot, separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def decode_snapshot(blob):
+    """Return the saved state dict from a snapshot, or None if it can't be used"""
+    try:
+        snapshot = json.loads(zlib.decompress(blob).decode("utf-8"))
+    except (zlib.error, ValueError) as e:
+        print(f"Discarding unreadable session checkpoint: {str(e)}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot["state"]
+
+
+class CheckpointStore:
+    """Interface for session checkpoint storage, keyed by session token"""
+
+    def save(self, token, blob):
+        raise NotImplementedError
+
+    def load(self, token):
+        raise NotImplementedError
+
+    def delete(self, token):
+        raise NotImplementedError
+
+    def prune(self, max_age=CHECKPOINT_MAX_AGE):
+        raise NotImplementedError
+
+
+class NullCheckpointStore(CheckpointStore):
+    """Store used when checkpoints are disabled"""
+
+    def save(self, token, blob):
+        pass
+
+    def load(self, token):
+        return None
+
+    def delete(self, token):
+        pass
+
+    def prune(self, max_age=CHECKPOINT_MAX_AGE):
+        pass
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoints in a single SQLite database, safe for several worker processes; tokens are stored hashed"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        private_directory(self.path.parent)
+        private_file(self.path)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    token TEXT PRIMARY KEY,
+                    snapshot BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        # A connection per call keeps the store usable from any thread
+        return sqlite3.connect(self.path, timeout=5)
+
+    def save(self, token, blob):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                (content_hash(token), blob, time.time())
+            )
+
+    def load(self, token):
+        with self._connect() as conn:
+            row = conn.execute("SELECT snapshot FROM checkpoints WHERE token = ?", (content_hash(token),)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, token):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE token = ?", (content_hash(token),))
+
+    def prune(self, max_age=CHECKPOINT_MAX_AGE):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE updated_at < ?", (time.time() - max_age,))
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoints as one file per session in a directory (e.g. a shared volume)"""
+
+    def __init__(self, directory):
+        self.directory = private_directory(directory)
+
+    def _path(self, token):
+        # Tokens are session secrets from the URL: store them hashed, which also keeps them in the directory
+        return self.directory / f"{content_hash(token)}.ckpt"
+
+    def save(self, token, blob):
+        path = self._path(token)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with os.fdopen(os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def load(self, token):
+        try:
+            with open(self._path(token), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, token):
+        try:
+            os.remove(self._path(token))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_age=CHECKPOINT_MAX_AGE):
+        cutoff = time.time() - max_age
+        for path in self.directory.glob("*.ckpt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def create_checkpoint_store(kind=SESSION_CHECKPOINT_STORE, path=SESSION_CHECKPOINT_PATH):
+    """Create the configured checkpoint store, falling back to no checkpoints on error"""
+    try:
+        if kind == "sqlite":
+            store = SQLiteCheckpointStore(Path(path) / "checkpoints.db")
+        elif kind == "file":
+            store = FileCheckpointStore(path)
+        else:
+            return NullCheckpointStore()
+        store.prune()
+        return store
+    except (OSError, sqlite3.Error) as e:
+        print(f"Session checkpoints disabled: {str(e)}")
+        return NullCheckpointStore()
+
+
+def save_checkpoint(store, token, state):
+    """Write a snapshot of the session; failures are logged and never break the interview"""
+    try:
+        store.save(token, encode_snapshot(state))
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error saving session checkpoint: {str(e)}")
+
+
+def restore_checkpoint(store, token, state):
+    """
+    Restore a session from its checkpoint.
+
+    Returns:
+    - True if a checkpoint was found and applied to state
+    """
+    try:
+        blob = store.load(token)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error loading session checkpoint: {str(e)}")
+        return False
+    if blob is None:
+        return False
+    saved = decode_snapshot(blob)
+    if saved is None:
+        return False
+    for key, value in saved.items():
+        state[key] = value
+    return True
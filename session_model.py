@@ -0,0 +1,165 @@
+import json
+import os
+import sys
+import tempfile
+import types
+from concurrent.futures import Future
+from result_cache import content_hash, private_directory
+from pathlib import Path
+
+# Past interviews kept in memory per session; older ones are offloaded to disk
+MAX_SESSION_HISTORY = 5
+
+# Where offloaded history is appended, one JSON line per interview
+SESSION_HISTORY_DIR = Path(os.environ.get(
+    "SESSION_HISTORY_DIR", Path(tempfile.gettempdir()) / "intervuai_history"
+))
+
+# Latest measured size of each live session in this worker, keyed by session ID
+SESSION_MEMORY_BYTES = {}
+
+# Sessions tracked in SESSION_MEMORY_BYTES; the least recently measured are dropped
+MAX_TRACKED_SESSIONS = 1000
+
+
+class HistoryEntry:
+    """Compact record of one finished interview in the practice history"""
+
+    __slots__ = ("interview_id", "timestamp", "job_field", "questions", "answers", "overall_scores")
+
+    def __init__(self, interview_id, timestamp, job_field, questions, answers, overall_scores):
+        self.interview_id = interview_id
+        self.timestamp = timestamp
+        self.job_field = job_field
+        # (category, text) snapshots, so later edits to the question bank don't change past interviews
+        self.questions = questions
+        self.answers = answers
+        self.overall_scores = overall_scores
+
+    def resolve_questions(self):
+        """Return the entry's questions as {"category", "question"} dicts"""
+        return [{"category": category, "question": text} for category, text in self.questions]
+
+    def to_dict(self):
+        return {
+            "interview_id": self.interview_id,
+            "timestamp": self.timestamp,
+            "job_field": self.job_field,
+            "questions": self.resolve_questions(),
+            "answers": list(self.answers),
+            "overall_scores": list(self.overall_scores),
+        }
+
+
+def build_history_entry(bank, interview_id, timestamp, job_field, questions, answers, evaluations):
+    """
+    Build a compact history entry for a finished interview.
+
+    Questions are kept as (category, text) snapshots, sharing the bank's
+    string objects while they are unchanged, and the feedback markdown is
+    dropped in favour of the overall score per question.
+    """
+    overall_by_question = {
+        e.get("question"): e.get("scores", {}).get("overall")
+        for e in evaluations
+    }
+    snapshots = []
+    for q in questions:
+        question_id = bank.question_id(job_field, q["question"])
+        if question_id is not None:
+            _, category, text = bank.get(question_id)
+        else:
+            category, text = q["category"], q["question"]
+        snapshots.append((category, text))
+    return HistoryEntry(
+        interview_id,
+        timestamp,
+        job_field,
+        tuple(snapshots),
+        tuple(answers),
+        tuple(overall_by_question.get(q["question"]) for q in questions)
+    )
+
+
+def record_history(history, entry, session_id):
+    """
+    Append an interview to the session history once, capping what stays in memory.
+
+    Reruns of the results screen call this repeatedly for the same interview,
+    so entries are de-duplicated by interview ID. When the cap is exceeded the
+    oldest entries are appended to SESSION_HISTORY_DIR and dropped from memory.
+
+    Returns:
+    - True if the entry was added, False if it was already recorded
+    """
+    if any(h.interview_id == entry.interview_id for h in history):
+        return False
+    history.append(entry)
+
+    overflow = len(history) - MAX_SESSION_HISTORY
+    if overflow > 0:
+        offloaded = history[:overflow]
+        del history[:overflow]
+        try:
+            # Owner-only, and named by a hash so the file name doesn't give away the session token
+            path = private_directory(SESSION_HISTORY_DIR) / f"{content_hash(session_id)}.jsonl"
+            fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o600)
+            with os.fdopen(fd, "a", encoding="utf-8") as f:
+                for old in offloaded:
+                    f.write(json.dumps(old.to_dict()) + "\n")
+        except OSError as e:
+            print(f"Could not offload session history: {str(e)}")
+    return True
+
+
+def estimate_size(obj, _seen=None):
+    """
+    Approximate deep size in bytes of an object graph, counting shared objects once.
+
+    Objects that hold large buffers out of sight (the TTS prefetcher's audio)
+    report them through a memory_bytes() method; finished futures count their
+    result, and other app objects are walked through their attributes.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if callable(getattr(obj, "memory_bytes", None)) and not isinstance(obj, type):
+        return size + obj.memory_bytes()
+    if isinstance(obj, Future):
+        if obj.done() and not obj.cancelled() and obj.exception() is None:
+            size += estimate_size(obj.result(), _seen)
+        return size
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(estimate_size(getattr(obj, name, None), _seen) for name in obj.__slots__)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, (type, types.ModuleType, types.FunctionType)):
+        size += estimate_size(vars(obj), _seen)
+    return size
+
+
+def record_session_memory(session_id, state):
+    """
+    Measure a session's state and publish it in SESSION_MEMORY_BYTES.
+
+    Objects that are shared across sessions (clients, executors, the question
+    bank) aren't stored in session state, so this is the per-session cost.
+    """
+    size = sum(estimate_size(state[key]) for key in list(state.keys()))
+    # Re-insert so dict order tracks recency, then forget sessions that went quiet
+    previous = SESSION_MEMORY_BYTES.pop(session_id, None)
+    SESSION_MEMORY_BYTES[session_id] = size
+    while len(SESSION_MEMORY_BYTES) > MAX_TRACKED_SESSIONS:
+        del SESSION_MEMORY_BYTES[next(iter(SESSION_MEMORY_BYTES))]
+    if previous is None or abs(size - previous) >= 64 * 1024:
+        print(f"session_memory_bytes={size} session={content_hash(session_id)[:12]} "
+              f"sessions={len(SESSION_MEMORY_BYTES)} worker_total={sum(SESSION_MEMORY_BYTES.values())}")
+    return size
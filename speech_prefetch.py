@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by all sessions in this worker; synthesis is network-bound, not CPU-bound
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-prefetch")
+
+# How many upcoming questions to synthesize ahead of the current one
+PREFETCH_LOOKAHEAD = 2
+
+# Upper bound on in-flight or unplayed prefetches held by one session
+MAX_PREFETCH_PER_SESSION = 4
+
+
+class SpeechPrefetcher:
+    """Per-session set of background TTS syntheses, keyed by (voice, text)"""
+
+    def __init__(self, max_pending=MAX_PREFETCH_PER_SESSION):
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        # One batched synthesis of many texts: (future, keys not yet taken, all its keys)
+        self._batch = None
+
+    def prefetch(self, synthesize, text, voice):
+        """
+        Start synthesizing text in the background so it can be played instantly later.
+
+        Parameters:
+        - synthesize: Callable taking (text, voice) and returning audio bytes.
+          It runs on a worker thread, so it must not touch st.session_state.
+        - text: Text to synthesize
+        - voice: Voice name the audio will be played with
+        """
+        key = (voice, text)
+        if key in self._pending:
+            self._pending.move_to_end(key)
+            return
+        if self._in_batch(key):
+            return
+        # Drop the oldest prefetch once the session is at its bound
+        while len(self._pending) >= self.max_pending:
+            _, stale = self._pending.popitem(last=False)
+            stale.cancel()
+        self._pending[key] = _executor.submit(synthesize, text, voice)
+
+    def prefetch_batch(self, synthesize_many, texts, voice):
+        """
+        Synthesize many texts with one background job, replacing any earlier batch.
+
+        Parameters:
+        - synthesize_many: Callable taking (texts, voice) and returning a dictionary
+          of text -> audio bytes. Texts missing from it are synthesized on demand.
+        - texts: Texts to synthesize
+        - voice: Voice name the audio will be played with
+        """
+        keys = {(voice, t) for t in texts}
+        # Reruns ask again for the same batch; keep the one in flight rather than paying for it twice
+        if self._batch and keys <= self._batch[2] and not self._failed(self._batch[0]):
+            return
+        if self._batch:
+            self._batch[0].cancel()
+        self._batch = (_executor.submit(synthesize_many, list(texts), voice), set(keys), keys)
+
+    @staticmethod
+    def _failed(future):
+        return future.done() and (future.cancelled() or future.exception() is not None)
+
+    def _in_batch(self, key):
+        """Whether a batch still in flight, or finished without error, covers key"""
+        if self._batch is None or key not in self._batch[1]:
+            return False
+        return not self._failed(self._batch[0])
+
+    def _take_from_batch(self, key, timeout):
+        if self._batch is None or key not in self._batch[1]:
+            return None
+        future, keys, _ = self._batch
+        keys.discard(key)
+        try:
+            # Popped, so played clips don't stay in memory; the batch's keys keep it from being redone
+            return future.result(timeout=timeout).pop(key[1], None)
+        except Exception as e:
+            print(f"Batched speech unavailable: {str(e)}")
+            return None
+
+    def take(self, text, voice, timeout=10):
+        """
+        Return prefetched audio for text, waiting for it if it's still in flight.
+
+        Returns None when nothing was prefetched or the background synthesis failed,
+        in which case the caller should synthesize synchronously.
+        """
+        future = self._pending.pop((voice, text), None)
+        if future is None:
+            return self._take_from_batch((voice, text), timeout)
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"Prefetched speech unavailable: {str(e)}")
+            return None
+
+    def memory_bytes(self):
+        """Bytes of synthesized audio this session holds that hasn't been played yet"""
+        futures = list(self._pending.values())
+        if self._batch:
+            futures.append(self._batch[0])
+        total = 0
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                result = future.result()
+                total += sum(map(len, result.values())) if isinstance(result, dict) else len(result)
+        return total
+
+    def cancel_all(self):
+        """Cancel queued syntheses and discard any results not yet played"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._batch:
+            self._batch[0].cancel()
+            self._batch = None
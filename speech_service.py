@@ -0,0 +1,320 @@
+# Speech sidecar: one process per host that owns the Whisper models and the
+# TTS client/cache for every Streamlit worker. Run it next to the app with
+# `python speech_service.py`; workers find it through SPEECH_SERVICE_SOCKET and
+# fall back to in-process models when it isn't running. Recordings are passed
+# through shared memory, so only small JSON headers go over the socket.
+import importlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from parallel_transcription import Segment, Word, TRANSCRIBE_WORKERS, model_threads, transcribe_samples
+
+# Unix socket the sidecar listens on
+SPEECH_SERVICE_SOCKET = os.environ.get(
+    "SPEECH_SERVICE_SOCKET", os.path.join(tempfile.gettempdir(), "intervuai_speech.sock")
+)
+
+# Seconds a worker waits for a reply before falling back to in-process models
+SPEECH_SERVICE_TIMEOUT = 300
+
+# Synthesized audio kept by the sidecar, shared by all workers (bytes)
+TTS_CACHE_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+
+class SpeechServiceError(Exception):
+    """The sidecar answered, but with an error"""
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("speech service closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _send_message(sock, header, payload=b""):
+    """Send a JSON header followed by an optional binary payload"""
+    header = dict(header, payload_bytes=len(payload))
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(encoded)) + encoded + payload)
+
+
+def _recv_message(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, size))
+    payload = _recv_exact(sock, header["payload_bytes"]) if header["payload_bytes"] else b""
+    return header, payload
+
+
+def _message_class(path):
+    """Import a proto-plus message class from "module:ClassName" """
+    module, _, name = path.partition(":")
+    if not module.startswith("google.cloud.texttospeech"):
+        raise SpeechServiceError(f"unsupported message type {path}")
+    return getattr(importlib.import_module(module), name)
+
+
+def _class_path(message):
+    return f"{type(message).__module__}:{type(message).__name__}"
+
+
+def _segments_to_json(segments):
+    return [
+        {
+            "start": s.start,
+            "end": s.end,
+            "text": s.text,
+            "words": [[w.start, w.end, w.word, w.probability] for w in s.words] if s.words else None,
+        }
+        for s in segments
+    ]
+
+
+def _segments_from_json(data):
+    return [
+        Segment(s["start"], s["end"], s["text"], [Word(*w) for w in s["words"]] if s["words"] else None)
+        for s in data
+    ]
+
+
+class SpeechServiceClient:
+    """
+    Worker-side handle on the sidecar.
+
+    Every call raises OSError or SpeechServiceError on failure so callers can
+    fall back to their in-process models.
+    """
+
+    def __init__(self, path=SPEECH_SERVICE_SOCKET, timeout=SPEECH_SERVICE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def _call(self, header, payload=b""):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            _send_message(sock, header, payload)
+            reply, reply_payload = _recv_message(sock)
+        if "error" in reply:
+            raise SpeechServiceError(reply["error"])
+        return reply, reply_payload
+
+    def transcribe(self, audio, model_size, device, compute_type, options):
+        """
+        Transcribe on the sidecar.
+
+        Parameters:
+        - audio: float32 16 kHz samples, or encoded bytes for Whisper to decode
+        - model_size, device, compute_type: Which Whisper model to use
+        - options: Passed through to model.transcribe
+
+        Returns:
+        - List of segments with word timings, like transcribe_samples
+        """
+        encoded = not isinstance(audio, np.ndarray)
+        data = bytes(audio) if encoded else np.ascontiguousarray(audio, dtype=np.float32)
+        size = len(data) if encoded else data.nbytes
+        buffer = shared_memory.SharedMemory(create=True, size=max(1, size))
+        try:
+            buffer.buf[:size] = data if encoded else data.view(np.uint8).ravel()
+            reply, _ = self._call({
+                "op": "transcribe",
+                "shm": buffer.name,
+                "size": size,
+                "encoded": encoded,
+                "model": [model_size, device, compute_type],
+                "options": options,
+            })
+        finally:
+            buffer.close()
+            buffer.unlink()
+        return _segments_from_json(reply["segments"])
+
+    def synthesize_speech(self, request=None, input=None, voice=None, audio_config=None, **kwargs):
+        """Same call as TextToSpeechClient.synthesize_speech, served from the sidecar's cache"""
+        if request is None:
+            from google.cloud import texttospeech
+            request = texttospeech.SynthesizeSpeechRequest(input=input, voice=voice, audio_config=audio_config)
+        reply, payload = self._call(
+            {"op": "synthesize", "request_type": _class_path(request)},
+            type(request).serialize(request)
+        )
+        return _message_class(reply["response_type"]).deserialize(payload)
+
+
+class FallbackTTSClient:
+    """TTS client that goes through the sidecar, and the in-process client when it is down"""
+
+    def __init__(self, service, local_client):
+        self.service = service
+        self.local_client = local_client
+
+    def synthesize_speech(self, *args, **kwargs):
+        if self.service.available():
+            try:
+                return self.service.synthesize_speech(*args, **kwargs)
+            except (OSError, SpeechServiceError) as e:
+                print(f"Speech service synthesis failed, using local client: {str(e)}")
+        return self.local_client.synthesize_speech(*args, **kwargs)
+
+
+class _SpeechModels:
+    """Everything the sidecar shares between connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._whisper = {}
+        self._tts_clients = {}
+        self._tts_cache = OrderedDict()
+        self._tts_cache_bytes = 0
+        # Every decode, whole recording or chunk, from all workers queues here, so no
+        # more than TRANSCRIBE_WORKERS run at once and the host's cores aren't oversubscribed
+        self.transcribe_slots = threading.Semaphore(TRANSCRIBE_WORKERS)
+
+    def whisper(self, model_size, device, compute_type):
+        key = (model_size, device, compute_type)
+        with self._lock:
+            if key not in self._whisper:
+                from faster_whisper import WhisperModel
+                self._whisper[key] = WhisperModel(
+                    model_size, device=device, compute_type=compute_type,
+                    cpu_threads=model_threads(),
+                    num_workers=TRANSCRIBE_WORKERS
+                )
+            return self._whisper[key]
+
+    def tts_client(self, module):
+        with self._lock:
+            if module not in self._tts_clients:
+                from google.oauth2 import service_account
+                credentials = None
+                raw = _read_secret("GOOGLE_TTS_CREDENTIALS_JSON")
+                if raw:
+                    credentials = service_account.Credentials.from_service_account_info(json.loads(raw))
+                self._tts_clients[module] = importlib.import_module(module).TextToSpeechClient(credentials=credentials)
+            return self._tts_clients[module]
+
+    def cached_speech(self, key):
+        with self._lock:
+            if key in self._tts_cache:
+                self._tts_cache.move_to_end(key)
+                return self._tts_cache[key]
+        return None
+
+    def cache_speech(self, key, value):
+        with self._lock:
+            if key in self._tts_cache:
+                return
+            self._tts_cache[key] = value
+            self._tts_cache_bytes += len(value[1])
+            while self._tts_cache_bytes > TTS_CACHE_BYTES and len(self._tts_cache) > 1:
+                _, (_, evicted) = self._tts_cache.popitem(last=False)
+                self._tts_cache_bytes -= len(evicted)
+
+
+def _read_secret(name):
+    """A secret from the environment, or from the app's .streamlit/secrets.toml"""
+    if os.environ.get(name):
+        return os.environ[name]
+    try:
+        import tomllib
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml"), "rb") as f:
+            return tomllib.load(f).get(name)
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+class _SpeechRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, payload = _recv_message(self.request)
+            if header["op"] == "transcribe":
+                _send_message(self.request, self._transcribe(header))
+            elif header["op"] == "synthesize":
+                response_type, audio = self._synthesize(header, payload)
+                _send_message(self.request, {"response_type": response_type}, audio)
+            else:
+                _send_message(self.request, {"error": f"unknown op {header['op']}"})
+        except Exception as e:
+            try:
+                _send_message(self.request, {"error": str(e)})
+            except OSError:
+                pass
+
+    def _transcribe(self, header):
+        buffer = shared_memory.SharedMemory(name=header["shm"])
+        # The worker owns the buffer; don't let this process's tracker unlink it at exit
+        resource_tracker.unregister(buffer._name, "shared_memory")
+        try:
+            data = bytes(buffer.buf[:header["size"]])
+        finally:
+            buffer.close()
+        if header["encoded"]:
+            from io import BytesIO
+            audio = BytesIO(data)
+        else:
+            audio = np.frombuffer(data, dtype=np.float32)
+        model = self.server.models.whisper(*header["model"])
+        slots = self.server.models.transcribe_slots
+        if header["encoded"]:
+            with slots:
+                segments, _ = model.transcribe(audio, **header["options"])
+                segments = list(segments)
+        else:
+            # Slots are taken per chunk, since one request runs several chunks at once
+            segments = transcribe_samples(
+                model, audio,
+                slots=slots,
+                **header["options"]
+            )
+        return {"segments": _segments_to_json(segments)}
+
+    def _synthesize(self, header, payload):
+        request_class = _message_class(header["request_type"])
+        key = (header["request_type"], payload)
+        cached = self.server.models.cached_speech(key)
+        if cached is not None:
+            return cached
+        request = request_class.deserialize(payload)
+        response = self.server.models.tts_client(request_class.__module__.rsplit(".types", 1)[0]).synthesize_speech(request=request)
+        value = (_class_path(response), type(response).serialize(response))
+        self.server.models.cache_speech(key, value)
+        return value
+
+
+class SpeechServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path=SPEECH_SERVICE_SOCKET):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _SpeechRequestHandler)
+        os.chmod(path, 0o600)
+        self.models = _SpeechModels()
+
+
+if __name__ == "__main__":
+    server = SpeechServer()
+    print(f"Speech service listening on {SPEECH_SERVICE_SOCKET}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(SPEECH_SERVICE_SOCKET):
+            os.unlink(SPEECH_SERVICE_SOCKET)
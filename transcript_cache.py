@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from result_cache import PersistentCache, content_hash
+
+# Transcripts kept in memory per worker
+TRANSCRIPT_CACHE_ENTRIES = 256
+
+# Set to "1" to also keep transcripts on disk, shared by workers and restarts
+TRANSCRIPT_CACHE_DISK = os.environ.get("TRANSCRIPT_CACHE_DISK", "0") == "1"
+
+# Bump when preprocessing or stitching changes what a recording transcribes to
+TRANSCRIPT_PIPELINE_VERSION = "transcript-v1"
+
+
+def transcript_key(audio, model_name, options):
+    """Cache key for a recording transcribed by a given model with given options"""
+    return content_hash(
+        TRANSCRIPT_PIPELINE_VERSION,
+        model_name,
+        json.dumps(options, sort_keys=True, default=str),
+        audio
+    )
+
+
+class TranscriptCache:
+    """
+    Transcripts by recording, bounded least-recently-used in memory, optionally
+    backed by a PersistentCache on disk.
+
+    Values are (transcript, delivery metrics) and are returned without touching
+    the model, so a rerun that hands back the same recording costs a hash.
+    """
+
+    def __init__(self, max_entries=TRANSCRIPT_CACHE_ENTRIES, disk=TRANSCRIPT_CACHE_DISK):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._disk = None
+        if disk:
+            try:
+                self._disk = PersistentCache("transcripts", max_entries=5000, max_age=7 * 24 * 3600)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Transcript disk cache disabled: {str(e)}")
+
+    def get(self, key):
+        """Return the cached (transcript, delivery metrics), or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = self._disk.get(key) if self._disk else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        value = tuple(value)
+        self._remember(key, value)
+        return value
+
+    def set(self, key, transcript, delivery):
+        value = (transcript, delivery)
+        self._remember(key, value)
+        if self._disk:
+            self._disk.set(key, list(value))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,155 @@
+import io
+import shutil
+import subprocess
+import wave
+from xml.sax.saxutils import escape
+import numpy as np
+
+# Google TTS rejects requests with more than 5000 bytes of input; stay clear of it
+MAX_BATCH_SSML_BYTES = 4500
+
+# Silence between prompts in a batch, so each clip ends cleanly before the next mark
+BATCH_BREAK_MS = 500
+
+# Bitrates used when re-encoding sliced clips to the session's encoding
+CLIP_ENCODERS = {
+    "OGG_OPUS": ["-c:a", "libopus", "-b:a", "24k", "-f", "ogg"],
+    "MP3": ["-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3"],
+}
+
+
+def can_encode_clips(encoding):
+    """
+    Whether sliced PCM can be delivered in encoding.
+
+    Without ffmpeg, clips could only be served as WAV, several times the size
+    of the negotiated MP3 or Opus; callers synthesize per prompt instead.
+    """
+    return encoding == "LINEAR16" or (encoding in CLIP_ENCODERS and shutil.which("ffmpeg") is not None)
+
+
+def build_batch_ssml(texts):
+    """SSML speaking each text in turn, with a <mark> before each and one at the end"""
+    parts = [
+        f'<mark name="clip{i}"/>{escape(text)}<break time="{BATCH_BREAK_MS}ms"/>'
+        for i, text in enumerate(texts)
+    ]
+    return f'<speak>{"".join(parts)}<mark name="end"/></speak>'
+
+
+def split_batches(texts, limit=MAX_BATCH_SSML_BYTES):
+    """Group texts in order into batches whose SSML stays under the request size limit"""
+    batches, current = [], []
+    for text in texts:
+        if current and len(build_batch_ssml(current + [text]).encode("utf-8")) > limit:
+            batches.append(current)
+            current = []
+        current.append(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def read_linear16(audio_content):
+    """(int16 samples, sample rate) from LINEAR16 audio, which Google returns with a WAV header"""
+    with wave.open(io.BytesIO(audio_content), "rb") as wav:
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    return samples, rate
+
+
+def slice_at_marks(samples, sample_rate, mark_times, count):
+    """
+    Cut batch audio into one clip per text.
+
+    Parameters:
+    - mark_times: {mark name: seconds} from the response timepoints
+    - count: How many texts were in the batch
+
+    Returns:
+    - List of int16 sample arrays, or None if a mark is missing
+    """
+    names = [f"clip{i}" for i in range(count)] + ["end"]
+    if any(name not in mark_times for name in names):
+        return None
+    edges = [min(len(samples), int(round(mark_times[name] * sample_rate))) for name in names]
+    edges[-1] = len(samples)
+    return [samples[start:end] for start, end in zip(edges, edges[1:])]
+
+
+def encode_clip(samples, sample_rate, encoding):
+    """
+    Encode int16 samples for playback.
+
+    Returns:
+    - Audio bytes in the requested encoding, or WAV when that needs ffmpeg
+      and it isn't installed or fails
+    """
+    if encoding in CLIP_ENCODERS and shutil.which("ffmpeg"):
+        try:
+            result = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-loglevel", "error",
+                 "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+                 *CLIP_ENCODERS[encoding], "pipe:1"],
+                input=samples.astype("<i2").tobytes(), capture_output=True, timeout=30
+            )
+            if result.returncode == 0 and result.stdout:
+                return result.stdout
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Clip encoding failed, using WAV: {str(e)}")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def synthesize_batch(client, texts, voice_name, encoding, sample_rate, speaking_rate=0.95):
+    """
+    Synthesize several prompts with one request per batch and slice them apart.
+
+    Uses the v1beta1 API, the only one that returns SSML mark timepoints.
+    Runs on background threads, so it must not touch st.
+
+    Parameters:
+    - client: A texttospeech_v1beta1 TextToSpeechClient (or a FallbackTTSClient around one)
+    - texts: The prompts, in order
+    - voice_name, encoding, sample_rate: As for single-prompt synthesis
+
+    Returns:
+    - Dictionary of text -> audio bytes
+    """
+    from google.cloud import texttospeech_v1beta1 as tts
+
+    clips = {}
+    for batch in split_batches(list(dict.fromkeys(texts))):
+        request = tts.SynthesizeSpeechRequest(
+            input=tts.SynthesisInput(ssml=build_batch_ssml(batch)),
+            voice=tts.VoiceSelectionParams(
+                language_code="en-US",
+                name=voice_name,
+                ssml_gender=tts.SsmlVoiceGender.MALE
+            ),
+            # PCM so clips can be cut at exact sample positions
+            audio_config=tts.AudioConfig(
+                audio_encoding=tts.AudioEncoding.LINEAR16,
+                sample_rate_hertz=sample_rate,
+                speaking_rate=speaking_rate,
+                pitch=0.0,
+                volume_gain_db=1.0
+            ),
+            enable_time_pointing=[tts.SynthesizeSpeechRequest.TimepointType.SSML_MARK]
+        )
+        response = client.synthesize_speech(request=request)
+        samples, rate = read_linear16(response.audio_content)
+        marks = {point.mark_name: point.time_seconds for point in response.timepoints}
+        pieces = slice_at_marks(samples, rate, marks, len(batch))
+        if pieces is None:
+            print("Batch synthesis response is missing marks; skipping batch")
+            continue
+        for text, piece in zip(batch, pieces):
+            clips[text] = encode_clip(piece, rate, encoding)
+    return clips
+
@@ -0,0 +1,57 @@
+import os
+import re
+import threading
+
+# "auto" picks per browser; "OGG_OPUS" or "MP3" forces one encoding for everyone
+TTS_AUDIO_ENCODING = os.environ.get("TTS_AUDIO_ENCODING", "auto")
+
+# Speech needs far less than the 24-48 kHz defaults; 16 kHz keeps voices natural
+TTS_SAMPLE_RATE_HERTZ = int(os.environ.get("TTS_SAMPLE_RATE_HERTZ", 16000))
+
+# Browser mime type for each encoding, used by the autoplay <audio> tag
+AUDIO_MIME_TYPES = {
+    "OGG_OPUS": "audio/ogg",
+    "MP3": "audio/mpeg",
+    "LINEAR16": "audio/wav",
+}
+
+# WebKit on iOS (every iOS browser) and desktop Safari can't reliably play Ogg Opus
+_NO_OPUS = re.compile(r"iPhone|iPad|iPod|CriOS|FxiOS|EdgiOS")
+_OPUS_BROWSERS = re.compile(r"Chrome/|Chromium/|Firefox/|Edg/|OPR/")
+
+# voice -> encoding -> [clips, total bytes] for this worker
+TTS_SIZE_STATS = {}
+_stats_lock = threading.Lock()
+
+# Log the size summary after this many clips
+SIZE_LOG_EVERY = 25
+
+
+def negotiate_encoding(user_agent):
+    """
+    Pick the most compact encoding the browser can play.
+
+    Ogg Opus is roughly half the size of MP3 for speech, but only Chromium
+    and Firefox play it everywhere; Safari and iOS get MP3.
+    """
+    if TTS_AUDIO_ENCODING != "auto":
+        return TTS_AUDIO_ENCODING
+    if user_agent and _OPUS_BROWSERS.search(user_agent) and not _NO_OPUS.search(user_agent):
+        return "OGG_OPUS"
+    return "MP3"
+
+
+def record_tts_size(voice, encoding, size):
+    """Track the encoded size of a played clip per voice and encoding"""
+    with _stats_lock:
+        stats = TTS_SIZE_STATS.setdefault(voice, {}).setdefault(encoding, [0, 0])
+        stats[0] += 1
+        stats[1] += size
+        total = sum(s[0] for by_encoding in TTS_SIZE_STATS.values() for s in by_encoding.values())
+        if total % SIZE_LOG_EVERY:
+            return
+        summary = " ".join(
+            f"{v}/{e}=n:{n},avg_bytes:{b // n}"
+            for v, by_encoding in TTS_SIZE_STATS.items() for e, (n, b) in by_encoding.items()
+        )
+    print(f"tts_sizes {summary}")
@@ -0,0 +1,119 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from audio_preprocessing import trim_silence
+from tts_batch import read_linear16, encode_clip
+
+# Set to "0" to synthesize the introduction as one piece of text
+TTS_TEMPLATED_INTRO = os.environ.get("TTS_TEMPLATED_INTRO", "1") == "1"
+
+# Introduction spoken as separate segments; only the first depends on the candidate
+INTRO_SEGMENTS = [
+    "Hi {name},",
+    "welcome to your interview practice for a {job_role} role.",
+    "I'll be asking you a series of questions.",
+]
+
+# Overlap between spliced segments, long enough to hide the seam (milliseconds)
+CROSSFADE_MS = 30
+
+# Synthesized segments kept per worker
+SEGMENT_CACHE_ENTRIES = 512
+
+
+def intro_text(name, job_role):
+    """The introduction as displayed, identical to what the spliced audio says"""
+    return " ".join(segment.format(name=name, job_role=job_role) for segment in INTRO_SEGMENTS)
+
+
+def synthesize_pcm(client, text, voice_name, sample_rate, speaking_rate=0.95):
+    """Synthesize text as LINEAR16 and return its int16 samples"""
+    from google.cloud import texttospeech
+
+    response = client.synthesize_speech(
+        input=texttospeech.SynthesisInput(text=text),
+        voice=texttospeech.VoiceSelectionParams(
+            language_code="en-US",
+            name=voice_name,
+            ssml_gender=texttospeech.SsmlVoiceGender.MALE
+        ),
+        audio_config=texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            speaking_rate=speaking_rate,
+            pitch=0.0,
+            volume_gain_db=1.0
+        )
+    )
+    samples, _ = read_linear16(response.audio_content)
+    return samples
+
+
+def splice_pcm(pieces, sample_rate, crossfade_ms=CROSSFADE_MS):
+    """
+    Join int16 clips end to end, crossfading linearly where they meet.
+
+    Each clip is trimmed of leading and trailing silence first (keeping a short
+    pad), so the pause between segments matches a natural phrase break rather
+    than the TTS engine's padding on both sides.
+    """
+    fade = int(sample_rate * crossfade_ms / 1000)
+    joined = np.zeros(0, dtype=np.float32)
+    for piece in pieces:
+        trimmed, _ = trim_silence(piece.astype(np.float32) / 32768.0, sample_rate)
+        if not len(trimmed):
+            continue
+        overlap = min(fade, len(joined), len(trimmed))
+        if overlap:
+            ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+            blended = joined[-overlap:] * (1.0 - ramp) + trimmed[:overlap] * ramp
+            joined = np.concatenate([joined[:-overlap], blended, trimmed[overlap:]])
+        else:
+            joined = np.concatenate([joined, trimmed])
+    return np.clip(np.round(joined * 32768.0), -32768, 32767).astype("<i2")
+
+
+class SegmentCache:
+    """PCM of synthesized phrases by (voice, sample rate, text), least recently used first out"""
+
+    def __init__(self, max_entries=SEGMENT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_synthesize(self, client, text, voice_name, sample_rate):
+        key = (voice_name, sample_rate, text)
+        with self._lock:
+            if key in self._segments:
+                self._segments.move_to_end(key)
+                return self._segments[key]
+        samples = synthesize_pcm(client, text, voice_name, sample_rate)
+        with self._lock:
+            self._segments[key] = samples
+            while len(self._segments) > self.max_entries:
+                self._segments.popitem(last=False)
+        return samples
+
+
+def templated_intro_audio(client, cache, name, job_role, voice_name, encoding, sample_rate):
+    """
+    Introduction audio built from cached segments.
+
+    The phrases shared by every candidate (per voice and job field) come from
+    the cache, so a new candidate costs a synthesis of just "Hi {name},".
+
+    Parameters:
+    - client: TextToSpeechClient (or a FallbackTTSClient around one)
+    - cache: SegmentCache shared by the worker's sessions
+    - name, job_role: Filled into INTRO_SEGMENTS
+    - voice_name, encoding, sample_rate: As for single-prompt synthesis
+
+    Returns:
+    - Audio bytes in the requested encoding (WAV if it couldn't be encoded)
+    """
+    pieces = [
+        cache.get_or_synthesize(client, segment.format(name=name, job_role=job_role), voice_name, sample_rate)
+        for segment in INTRO_SEGMENTS
+    ]
+    return encode_clip(splice_pcm(pieces, sample_rate), sample_rate, encoding)